@@ -1,16 +1,18 @@
 """BAC parser classes."""
 
 import datetime
+import itertools
 from pathlib import Path
 from typing import ClassVar
 
-import click
 from lunchable import TransactionInsertObject
 from lunchable.exceptions import LunchMoneyHTTPError
 from lunchable.models import AssetsObject
 
-from entities.base import Base
-from utils import LunchMoneyCR, _float, _str, config_logger, slugify
+from entities.base import Balance, Base, Gap
+from utils import ROW_LEVEL, LunchMoneyCR, _float, _str, config_logger, slugify
+
+logger = config_logger("entities/bac.py")
 
 
 class BACAccount(Base):
@@ -56,15 +58,16 @@ class BACAccount(Base):
     def define_assets(self) -> None:
         """Define assets or account target in lunch money."""
         rows = self.read_rows(BACAccount.asset_field_names)
+        # statement header, kept for its initial and total balances.
+        self.header: dict = rows[1] if len(rows) > 1 else {}
         if not rows:
             self.assets = []
             return
-        product = _str(rows[1].get("Product", ""))
+        product = _str(self.header.get("Product", ""))
         self.assets = list(filter(lambda a: a.name == product, self.lunch_money.cached_assets))
 
-    def insert_transactions(self) -> None:
-        """Insert transactions into an already define lunch money assets."""
-        logger = config_logger("entities/bac.py")
+    def transactions(self) -> list[dict]:
+        """Read, clean and sort transactions for an already define lunch money assets."""
         if not self.assets:
             self.define_assets()
 
@@ -75,23 +78,16 @@ class BACAccount(Base):
         cleaned_transactions = list(filter(BACAccount.clean_transaction, raw_transactions))
         if not cleaned_transactions:
             logger.warning("No transactions to apply")
-            return
+            return []
         logger.debug("Cleaned transactions: %d", len(cleaned_transactions))
-        starts = "-".join(BACAccount._date(cleaned_transactions[0]))
-        ends = "-".join(BACAccount._date(cleaned_transactions[-1]))
-        logger.debug("from %s to %s (DD/MM/YYYY)", starts, ends)
-        if click.confirm("Do you want to continue?"):
-            applied_transactions = 0
-            for transaction in cleaned_transactions:
-                result = self.insert_transaction(transaction)
-                applied_transactions += 1 if result else 0
-            logger.info("Applied transactions: %d", applied_transactions)
+        starts = BACAccount._date(cleaned_transactions[0])
+        self.statement_end = BACAccount._date(cleaned_transactions[-1])
+        logger.debug("from %s to %s", starts, self.statement_end)
+        return cleaned_transactions
 
     def insert_transaction(self, transaction: dict) -> list[int]:
         """Actual single insert."""
-        logger = config_logger("entities/bac.py")
         try:
-            day, month, year = BACAccount._date(transaction)
             debit_as_negative = BACAccount._credit(transaction) > 0
             external_id = BACAccount._external_id(transaction)
             _asset = self.assets[0]
@@ -99,26 +95,63 @@ class BACAccount(Base):
                 amount=BACAccount._amount(transaction),
                 asset_id=_asset.id,
                 currency=_asset.currency,
-                date=datetime.date(int(year), int(month), int(day)),
+                date=BACAccount._date(transaction),
                 external_id=external_id,
                 notes=BACAccount._notes(transaction),
                 payee="",
             )
-            result = self.lunch_money.insert_transactions(
-                transactions=transaction_insert,
-                apply_rules=True,
-                skip_duplicates=False,
-                debit_as_negative=debit_as_negative,
-                skip_balance_update=False,
-            )
+            result = self.submit_transaction(transaction_insert, debit_as_negative=debit_as_negative)
             if result:
-                logger.info("Applied transaction: %s-%s", result, external_id)
+                logger.log(ROW_LEVEL, "Applied transaction: %s-%s", result, external_id)
         except (ValueError, LunchMoneyHTTPError) as exception:
             logger.debug("Could not applied transaction: %s", transaction.get("Description of transactions", ""))
             logger.debug(exception)
             return []
         return result
 
+    def closing_balances(self, transactions: list[dict], balances: dict[int, Balance]) -> dict[int, Balance]:
+        """Take the closing balance reported by the statement, unless lunch money already has a newer one."""
+        _asset = self.assets[0]
+        as_of = balances[_asset.id].as_of if _asset.id in balances else _asset.balance_as_of
+        ends = self.statement_end or self.transaction_date(transactions[-1])
+        if as_of and ends < as_of.date():
+            # a backfill, the newer balance only moves by the transactions added before it.
+            closing = super().closing_balances(transactions, balances)[_asset.id]
+            return {**balances, _asset.id: Balance(closing.amount, as_of)}
+        try:
+            balance = _float(self.header["Total balance"])
+        except (KeyError, AttributeError, ValueError):
+            balance = _float(BACAccount._balance(transactions[-1]))
+        return {**balances, _asset.id: Balance(balance, datetime.datetime.combine(ends, datetime.time(), datetime.UTC))}
+
+    def balance_gaps(self, transactions: list[dict]) -> list[Gap]:
+        """Rows whose transaction balance does not follow from the previous one.
+
+        The last row is a gap too when the statement ends before reaching its header total balance. Amounts are summed
+        in cents in one cumulative pass from the header initial balance; a gap is every row where the difference between
+        the reported and the computed balance changes, usually rows missing right before it.
+        """
+        if not transactions:
+            return []
+        inflows = [round(BACAccount._inflow(t) * 100) for t in transactions]
+        reported = [round(_float(BACAccount._balance(t)) * 100) for t in transactions]
+        try:
+            initial = round(_float(self.header["Initial balance"]) * 100)
+            total = round(_float(self.header["Total balance"]) * 100)
+        except (KeyError, AttributeError, ValueError):
+            initial, total = reported[0] - inflows[0], None
+        gaps = []
+        offset = 0
+        computed = itertools.accumulate(inflows, initial=initial)
+        next(computed)
+        for transaction, balance, running in zip(transactions, reported, computed, strict=False):
+            if balance - running != offset:
+                gaps.append(Gap(transaction, (running + offset) / 100, balance / 100))
+                offset = balance - running
+        if total is not None and reported[-1] != total:
+            gaps.append(Gap(transactions[-1], total / 100, reported[-1] / 100))
+        return gaps
+
     @staticmethod
     def clean_transaction(transaction: dict) -> dict:
         """Parse raw row and build TransactionInsertObject."""
@@ -156,8 +189,13 @@ class BACAccount(Base):
         return debit or credit
 
     @staticmethod
-    def _date(transaction: dict) -> list:
-        return _str(transaction["Transaction date"]).split("/")
+    def _date(transaction: dict) -> datetime.date:
+        day, month, year = _str(transaction["Transaction date"]).split("/")
+        return datetime.date(int(year), int(month), int(day))
+
+    @staticmethod
+    def _inflow(transaction: dict) -> float:
+        return BACAccount._credit(transaction) - _float(transaction["Transaction debit"])
 
 
 class BACCreditCard(Base):
@@ -193,9 +231,8 @@ class BACCreditCard(Base):
         product = _str(rows[1]["Pro000000000000duct"])
         self.assets: list[AssetsObject] = list(filter(lambda a: a.name == product, self.lunch_money.cached_assets))
 
-    def insert_transactions(self) -> None:
-        """Insert transactions into an already define lunch money assets."""
-        logger = config_logger("entities/bac.py")
+    def transactions(self) -> list[dict]:
+        """Read, clean and sort transactions for an already define lunch money assets."""
         if not self.assets:
             self.define_asset()
 
@@ -207,16 +244,10 @@ class BACCreditCard(Base):
         starts = BACCreditCard._date(cleaned_transactions[0])
         ends = BACCreditCard._date(cleaned_transactions[-1])
         logger.debug("from %s to %s", starts, ends)
-        if click.confirm("Do you want to continue?"):
-            applied_transactions = 0
-            for transaction in cleaned_transactions:
-                result = self.insert_transaction(transaction)
-                applied_transactions += 1 if result else 0
-            logger.info("Applied transactions: %d", applied_transactions)
+        return cleaned_transactions
 
     def insert_transaction(self, transaction: dict) -> list[int]:
         """Actual single insert."""
-        logger = config_logger("entities/bac.py")
         try:
             _asset = self._asset(transaction)
             if not _asset:
@@ -231,15 +262,12 @@ class BACCreditCard(Base):
                 notes=BACCreditCard._notes(transaction),
                 payee="",
             )
-            result = self.lunch_money.insert_transactions(
-                transactions=transaction_insert,
-                apply_rules=True,
-                skip_duplicates=False,
+            result = self.submit_transaction(
+                transaction_insert,
                 debit_as_negative=BACCreditCard._debit_as_negative(transaction),
-                skip_balance_update=False,
             )
             if result:
-                logger.info("Applied transaction: %s-%s", result, self._external_id(transaction))
+                logger.log(ROW_LEVEL, "Applied transaction: %s-%s", result, self._external_id(transaction))
         except (ValueError, LunchMoneyHTTPError) as exception:
             logger.debug("Could not applied transaction: %s", transaction)
             logger.debug("Exception: %s", exception)
@@ -294,3 +322,7 @@ class BACCreditCard(Base):
     @staticmethod
     def _debit_as_negative(transaction: dict) -> bool:
         return (_float(transaction["Local"]) or _float(transaction["Dollars "])) < 0
+
+    @staticmethod
+    def _inflow(transaction: dict) -> float:
+        return -(_float(transaction["Local"]) or _float(transaction["Dollars "]))
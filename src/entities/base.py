@@ -1,12 +1,49 @@
 """Base for Entities."""
 
+import abc
 import csv
+import datetime
+import sqlite3
+import threading
+import zipfile
 from pathlib import Path
+from typing import NamedTuple
+from xml.etree import ElementTree as ET
 
-from utils import LunchMoneyCR, config_logger
+import click
+from lunchable import TransactionInsertObject
+from lunchable.exceptions import LunchMoneyHTTPError
+from lunchable.models import AssetsObject
 
+import xlsx
+from utils import PROGRESS, LunchMoneyCR, Progress, config_logger
 
-class Base:
+logger = config_logger("entities/base.py")
+# cleaned transactions paired with the entity that parsed them.
+type Stream = list[tuple["Base", dict]]
+# a parsed file with its cleaned transactions.
+type Statement = tuple["Base", list[dict]]
+# applied transactions with their lunch money ids.
+type Applied = list[tuple["Base", dict, list[int]]]
+CONFIRM_LOCK = threading.Lock()
+
+
+class Balance(NamedTuple):
+    """Asset balance and when it was known, None for now."""
+
+    amount: float
+    as_of: datetime.datetime | None
+
+
+class Gap(NamedTuple):
+    """Transaction whose reported balance does not follow from the ones before it."""
+
+    transaction: dict
+    expected: float
+    reported: float
+
+
+class Base(abc.ABC):
     """Base for Entities."""
 
     delimiter = ""
@@ -17,10 +54,17 @@ class Base:
         self.assets = []
         self.file_name = file_name
         self.lunch_money = lunch_money
+        # date of the last transaction, for statements that report balances.
+        self.statement_end: datetime.date | None = None
 
     def read_rows(self, field_names: list) -> list[dict] | list:
-        """Read lines from CSV files and return a list."""
-        logger = config_logger("entities/base.py")
+        """Read lines from CSV or XLSX files and return a list."""
+        if Path(self.file_name).suffix.lower() == ".xlsx":
+            try:
+                return list(xlsx.DictReader(self.file_name, field_names))
+            except (zipfile.BadZipFile, KeyError, IndexError, ValueError, ET.ParseError):
+                logger.debug("%s - could not read workbook", self.__class__.__name__)
+                return []
         with Path(self.file_name).open(encoding=self.encoding) as csvfile:
             if self.delimiter:
                 reader = csv.DictReader(csvfile, field_names, delimiter=self.delimiter)
@@ -33,5 +77,150 @@ class Base:
                 return []
             return rows
 
-    def define_asset(self) -> None:
+    @staticmethod
+    @abc.abstractmethod
+    def infer(lunch_money: LunchMoneyCR, file_name: Path) -> list[AssetsObject]:
+        """Lunch money assets of file_name, empty when it is not a statement of this entity."""
+
+    def define_asset(self) -> None:  # noqa: B027
         """Define assets or account target in lunch money."""
+
+    @abc.abstractmethod
+    def transactions(self) -> list[dict]:
+        """Read, clean and sort transactions for an already define lunch money assets."""
+
+    @abc.abstractmethod
+    def insert_transaction(self, transaction: dict) -> list[int]:
+        """Actual single insert."""
+
+    def submit_transaction(self, transaction_insert: TransactionInsertObject, *, debit_as_negative: bool) -> list[int]:
+        """Categorize and send a single transaction to lunch money, unless the warehouse knows it was already sent."""
+        warehouse = self.lunch_money.warehouse
+        if warehouse and warehouse.imported(transaction_insert.asset_id, transaction_insert.external_id):
+            logger.debug("Already imported: %s", transaction_insert.external_id)
+            return []
+        self.lunch_money.categorize(transaction_insert)
+        result = self.lunch_money.insert_transactions(
+            transactions=transaction_insert,
+            apply_rules=self.lunch_money.apply_rules,
+            skip_duplicates=False,
+            debit_as_negative=debit_as_negative,
+            skip_balance_update=self.lunch_money.deferred_balance,
+        )
+        if warehouse:
+            try:
+                warehouse.record(
+                    transaction_insert,
+                    debit_as_negative=debit_as_negative,
+                    asset_name=next((a.name for a in self.assets if a.id == transaction_insert.asset_id), ""),
+                    lunch_money_ids=result,
+                    source_file=self.file_name,
+                )
+            except sqlite3.Error as exception:
+                # already in lunch money, losing the record only means it is sent again on the next run.
+                logger.warning("Could not record %s in the warehouse: %s", transaction_insert.external_id, exception)
+        return result
+
+    def closing_balances(self, transactions: list[dict], balances: dict[int, Balance]) -> dict[int, Balance]:
+        """Compute closing balances locally, carrying on from balances or the current asset balances."""
+        balances = dict(balances)
+        for transaction in transactions:
+            _asset = self.transaction_asset(transaction)
+            if not _asset:
+                continue
+            # credit assets track the owed amount, so inflows (payments) reduce it.
+            inflow = -self._inflow(transaction) if _asset.type_name == "credit" else self._inflow(transaction)
+            current = balances.get(_asset.id, Balance(_asset.balance, _asset.balance_as_of))
+            balances[_asset.id] = Balance(current.amount + inflow, None)
+        return balances
+
+    def balance_gaps(self, transactions: list[dict]) -> list[Gap]:  # noqa: ARG002
+        """Transactions inconsistent with the balances reported by the statement, none when it reports no balances."""
+        return []
+
+    def validate(self, transactions: list[dict]) -> bool:
+        """Tell if transactions match the reported balances, logging every gap."""
+        gaps = self.balance_gaps(transactions)
+        for gap in gaps:
+            logger.error(
+                "%s - balance gap at %s %s: expected %.2f, reported %.2f",
+                Path(self.file_name).name,
+                self.transaction_date(gap.transaction).isoformat(),
+                self.transaction_external_id(gap.transaction),
+                gap.expected,
+                gap.reported,
+            )
+        return not gaps
+
+    def transaction_asset(self, transaction: dict) -> AssetsObject | None:
+        """Lunch money asset a cleaned transaction belongs to."""
+        try:
+            return self._asset(transaction)
+        except (StopIteration, ValueError):
+            return None
+
+    def transaction_date(self, transaction: dict) -> datetime.date:
+        """Date of a cleaned transaction."""
+        return self._date(transaction)
+
+    def transaction_external_id(self, transaction: dict) -> str:
+        """External id of a cleaned transaction, the same one sent to lunch money."""
+        return self._external_id(transaction)
+
+    def transaction_inflow(self, transaction: dict) -> float:
+        """Signed amount of a cleaned transaction, positive when money comes into the asset."""
+        return self._inflow(transaction)
+
+    def _asset(self, transaction: dict) -> AssetsObject | None:  # noqa: ARG002
+        return self.assets[0] if self.assets else None
+
+    @abc.abstractmethod
+    def _inflow(self, transaction: dict) -> float:
+        """Signed amount, positive when money comes into the asset."""
+
+    @abc.abstractmethod
+    def _date(self, transaction: dict) -> datetime.date: ...
+
+    @abc.abstractmethod
+    def _external_id(self, transaction: dict) -> str: ...
+
+
+def apply_stream(lunch_money: LunchMoneyCR, stream: Stream, label: str) -> Applied:
+    """Insert (entity, transaction) pairs once confirmed, return the applied ones with their lunch money ids."""
+    # profiles are imported concurrently, keep prompts from overlapping.
+    with CONFIRM_LOCK:
+        if not lunch_money.assume_yes and not click.confirm(f"{label} - Do you want to continue?"):
+            return []
+    progress = Progress(logger, len(stream)) if PROGRESS else None
+    applied: Applied = []
+    for entity, transaction in stream:
+        result = entity.insert_transaction(transaction)
+        if result:
+            applied.append((entity, transaction, result))
+        if progress:
+            progress.update(applied=bool(result))
+    logger.info("Applied transactions: %d", len(applied))
+    if lunch_money.deferred_balance:
+        update_balances(lunch_money, applied)
+    return applied
+
+
+def update_balances(lunch_money: LunchMoneyCR, applied: Applied) -> None:
+    """Set each asset balance once, after all of its transactions were inserted."""
+    by_entity: dict[Base, list[dict]] = {}
+    for entity, transaction, _ in applied:
+        by_entity.setdefault(entity, []).append(transaction)
+    # statements are folded oldest first, so the latest one has the last word on reported balances.
+    balances: dict[int, Balance] = {}
+    for entity, transactions in sorted(
+        by_entity.items(),
+        key=lambda e: e[0].statement_end or e[0].transaction_date(e[1][-1]),
+    ):
+        balances = entity.closing_balances(transactions, balances)
+    for asset_id, balance in balances.items():
+        try:
+            asset = lunch_money.set_asset_balance(asset_id, round(balance.amount, 2), balance.as_of)
+        except LunchMoneyHTTPError as exception:
+            logger.warning("Could not update balance of asset %s: %s", asset_id, exception)
+            continue
+        logger.info("Balance updated: %s | %s %s", asset.name, asset.balance, asset.currency)
@@ -4,12 +4,14 @@ import datetime
 from pathlib import Path
 from typing import ClassVar
 
-import click
 from lunchable import TransactionInsertObject
+from lunchable.exceptions import LunchMoneyHTTPError
 from lunchable.models import AssetsObject
 
 from entities.base import Base
-from utils import LunchMoneyCR, _float, _str, config_logger, slugify
+from utils import ROW_LEVEL, LunchMoneyCR, _float, _str, config_logger, slugify
+
+logger = config_logger("entities/payoneer.py")
 
 
 class PayoneerAccount(Base):
@@ -54,9 +56,8 @@ class PayoneerAccount(Base):
             return
         self.assets = [a for a in self.lunch_money.cached_assets if a.name == "PAYONEER"]
 
-    def insert_transactions(self) -> None:
-        """Insert transactions into an already define lunch money assets."""
-        logger = config_logger("entities/payoneer.py")
+    def transactions(self) -> list[dict]:
+        """Read, clean and sort transactions for an already define lunch money assets."""
         if not self.assets:
             self.define_asset()
 
@@ -70,16 +71,10 @@ class PayoneerAccount(Base):
         starts = PayoneerAccount._date(cleaned_transactions[0])
         ends = PayoneerAccount._date(cleaned_transactions[-1])
         logger.debug("from %s to %s", starts, ends)
-        if click.confirm("Do you want to continue?"):
-            applied_transactions = 0
-            for transaction in cleaned_transactions:
-                result = self.insert_transaction(transaction)
-                applied_transactions += 1 if result else 0
-            logger.info("Applied transactions: %s", applied_transactions)
+        return cleaned_transactions
 
     def insert_transaction(self, transaction: dict) -> list[int]:
         """Actual single insert."""
-        logger = config_logger("entities/payoneer.py")
         try:
             _asset = self.assets[0]
             transaction_insert = TransactionInsertObject(
@@ -92,17 +87,12 @@ class PayoneerAccount(Base):
                 payee="",
             )
             _debit_as_negative = PayoneerAccount._debit_as_negative(transaction)
-            result = self.lunch_money.insert_transactions(
-                transactions=transaction_insert,
-                apply_rules=True,
-                skip_duplicates=False,
-                debit_as_negative=_debit_as_negative,
-                skip_balance_update=False,
-            )
+            result = self.submit_transaction(transaction_insert, debit_as_negative=_debit_as_negative)
             if result:
-                logger.info("Applied transaction: %s-%s", result, PayoneerAccount._external_id(transaction))
-        except ValueError:
-            logger.exception("could not applied transaction: %s", transaction)
+                logger.log(ROW_LEVEL, "Applied transaction: %s-%s", result, PayoneerAccount._external_id(transaction))
+        except (ValueError, LunchMoneyHTTPError) as exception:
+            logger.debug("Could not applied transaction: %s", transaction.get("Description", ""))
+            logger.debug(exception)
             return []
         return result
 
@@ -139,3 +129,8 @@ class PayoneerAccount(Base):
     @staticmethod
     def _debit_as_negative(transaction: dict) -> bool:
         return bool(transaction["Credit Amount"])
+
+    @staticmethod
+    def _inflow(transaction: dict) -> float:
+        amount = _float(PayoneerAccount._amount(transaction).replace(",", ""))
+        return amount if PayoneerAccount._debit_as_negative(transaction) else -amount
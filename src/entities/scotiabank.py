@@ -4,13 +4,14 @@ import datetime
 from pathlib import Path
 from typing import ClassVar
 
-import click
 from lunchable import TransactionInsertObject
 from lunchable.exceptions import LunchMoneyHTTPError
 from lunchable.models import AssetsObject
 
 from entities.base import Base
-from utils import LunchMoneyCR, _float, _str, config_logger, slugify
+from utils import ROW_LEVEL, LunchMoneyCR, _float, _str, config_logger, slugify
+
+logger = config_logger("entities/scotiabank.py")
 
 
 class ScotiabankAccount(Base):
@@ -45,9 +46,8 @@ class ScotiabankAccount(Base):
             a for a in self.lunch_money.cached_assets if a.name == rows[1].get("NUMERO_CUENTA")
         ]
 
-    def insert_transactions(self) -> None:
-        """Insert transactions into an already define lunch money assets."""
-        logger = config_logger("entities/scotiabank.py")
+    def transactions(self) -> list[dict]:
+        """Read, clean and sort transactions for an already define lunch money assets."""
         if not self.assets:
             self.define_asset()
 
@@ -60,16 +60,10 @@ class ScotiabankAccount(Base):
         starts = ScotiabankAccount._date(cleaned_transactions[0])
         ends = ScotiabankAccount._date(cleaned_transactions[-1])
         logger.debug("from %s to %s", starts, ends)
-        if click.confirm("Do you want to continue?"):
-            applied_transactions = 0
-            for transaction in cleaned_transactions:
-                result = self.insert_transaction(transaction)
-                applied_transactions += 1 if result else 0
-            logger.info("Applied transactions: %d", applied_transactions)
+        return cleaned_transactions
 
     def insert_transaction(self, transaction: dict) -> list[int]:
         """Actual single insert."""
-        logger = config_logger("entities/scotiabank.py")
         try:
             _asset = self.assets[0]
             transaction_insert = TransactionInsertObject(
@@ -81,15 +75,12 @@ class ScotiabankAccount(Base):
                 notes=ScotiabankAccount._notes(transaction),
                 payee="",
             )
-            result = self.lunch_money.insert_transactions(
-                transactions=transaction_insert,
-                apply_rules=True,
-                skip_duplicates=False,
+            result = self.submit_transaction(
+                transaction_insert,
                 debit_as_negative=ScotiabankAccount._debit_as_negative(transaction),
-                skip_balance_update=False,
             )
             if result:
-                logger.info("Applied transaction: %s-%s", result, self._external_id(transaction))
+                logger.log(ROW_LEVEL, "Applied transaction: %s-%s", result, self._external_id(transaction))
         except (ValueError, LunchMoneyHTTPError) as exception:
             logger.debug("Could not applied transaction: %s", transaction.get("CONCEPTO"))
             logger.debug(exception)
@@ -126,6 +117,11 @@ class ScotiabankAccount(Base):
     def _debit_as_negative(transaction: dict) -> bool:
         return transaction["TIPO_MOVIMIENTO"] == "C"
 
+    @staticmethod
+    def _inflow(transaction: dict) -> float:
+        amount = ScotiabankAccount._amount(transaction)
+        return amount if ScotiabankAccount._debit_as_negative(transaction) else -amount
+
     @staticmethod
     def _external_id(transaction: dict) -> str:
         return slugify(
@@ -185,9 +181,8 @@ class ScotiabankCreditCard(Base):
             self.assets = []
             return
 
-    def insert_transactions(self) -> None:
-        """Insert transactions into an already define lunch money assets."""
-        logger = config_logger("entities/scotiabank.py")
+    def transactions(self) -> list[dict]:
+        """Read, clean and sort transactions for an already define lunch money assets."""
         if not self.assets:
             self.define_asset()
 
@@ -200,16 +195,10 @@ class ScotiabankCreditCard(Base):
         starts = ScotiabankCreditCard._date(cleaned_transactions[0])
         ends = ScotiabankCreditCard._date(cleaned_transactions[-1])
         logger.debug("from %s to %s", starts, ends)
-        if click.confirm("Do you want to continue?"):
-            applied_transactions = 0
-            for transaction in cleaned_transactions:
-                result = self.insert_transaction(transaction)
-                applied_transactions += 1 if result else 0
-            logger.info("Applied transactions: %d", applied_transactions)
+        return cleaned_transactions
 
     def insert_transaction(self, transaction: dict) -> list[int]:
         """Actual single insert."""
-        logger = config_logger("entities/scotiabank.py")
         try:
             _asset = self._asset(transaction)
             if not _asset:
@@ -223,15 +212,12 @@ class ScotiabankCreditCard(Base):
                 notes=ScotiabankCreditCard._notes(transaction),
                 payee="",
             )
-            result = self.lunch_money.insert_transactions(
-                transactions=transaction_insert,
-                apply_rules=True,
-                skip_duplicates=False,
+            result = self.submit_transaction(
+                transaction_insert,
                 debit_as_negative=ScotiabankCreditCard._debit_as_negative(transaction),
-                skip_balance_update=False,
             )
             if result:
-                logger.info("Applied transaction: %s-%s", result, self._external_id(transaction))
+                logger.log(ROW_LEVEL, "Applied transaction: %s-%s", result, self._external_id(transaction))
         except (ValueError, LunchMoneyHTTPError) as exception:
             logger.debug("Could not applied transaction: %s", transaction.get("Descripción"))
             logger.debug(exception)
@@ -298,3 +284,8 @@ class ScotiabankCreditCard(Base):
     @staticmethod
     def _debit_as_negative(transaction: dict) -> bool:
         return transaction["Tipo"] == "CREDITO"
+
+    @staticmethod
+    def _inflow(transaction: dict) -> float:
+        amount = ScotiabankCreditCard._amount(transaction)
+        return amount if ScotiabankCreditCard._debit_as_negative(transaction) else -amount
@@ -0,0 +1,190 @@
+"""Local stand-in for the Lunch Money API, for load tests."""
+
+import argparse
+import datetime
+import json
+import random
+import re
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+
+from utils import config_logger
+
+logger = config_logger("fakeserver.py")
+
+
+class FakeLunchMoney:
+    """In memory budget with the asset and transaction endpoints used by LunchMoneyCR.
+
+    latency: seconds added to every response, with +/- 50% jitter.
+    error_rate: share of requests answered with a 500.
+    rate_limit: requests per second allowed before answering 429, 0 for no limit.
+    Transactions with an external id already inserted for the same asset are skipped, as Lunch Money does.
+    """
+
+    def __init__(
+        self,
+        assets: list[dict],
+        *,
+        latency: float = 0.0,
+        error_rate: float = 0.0,
+        rate_limit: float = 0.0,
+        seed: int | None = None,
+    ) -> None:
+        """Initialize."""
+        self.assets = {a["id"]: a for a in assets}
+        self.latency = latency
+        self.error_rate = error_rate
+        self.rate_limit = rate_limit
+        self.random = random.Random(seed)  # noqa: S311
+        self.lock = threading.Lock()
+        self.transactions: dict[int, dict] = {}
+        self.external_ids: set[tuple[int, str]] = set()
+        self.groups: dict[int, list[int]] = {}
+        self.requests: Counter[tuple[str, str, int]] = Counter()
+        self._tokens = rate_limit
+        self._refilled = time.monotonic()
+
+    def handle(self, method: str, path: str, payload: dict) -> tuple[int, object]:
+        """Answer a request, return status code and JSON body."""
+        with self.lock:
+            status, body = self._throttle() or self._fail() or self._route(method, path, payload)
+            self.requests[method, re.sub(r"/\d+", "/{id}", path), status] += 1
+        if self.latency:
+            time.sleep(self.latency * self.random.uniform(0.5, 1.5))
+        return status, body
+
+    def _throttle(self) -> tuple[int, object] | None:
+        if not self.rate_limit:
+            return None
+        now = time.monotonic()
+        self._tokens = min(self.rate_limit, self._tokens + (now - self._refilled) * self.rate_limit)
+        self._refilled = now
+        if self._tokens < 1:
+            return 429, {"error": "Too many requests"}
+        self._tokens -= 1
+        return None
+
+    def _fail(self) -> tuple[int, object] | None:
+        if self.error_rate and self.random.random() < self.error_rate:
+            return 500, {"error": "Internal server error"}
+        return None
+
+    def _route(self, method: str, path: str, payload: dict) -> tuple[int, object]:
+        match method, path.rstrip("/").split("/")[1:]:
+            case "GET", ["v1", "assets"]:
+                return 200, {"assets": list(self.assets.values())}
+            case "PUT", ["v1", "assets", asset_id] if int(asset_id) in self.assets:
+                self.assets[int(asset_id)].update(payload)
+                return 200, self.assets[int(asset_id)]
+            case "GET", ["v1", "categories"]:
+                return 200, {"categories": []}
+            case "POST", ["v1", "transactions"]:
+                return 200, {"ids": self._insert(payload.get("transactions", []))}
+            case "POST", ["v1", "transactions", "group"]:
+                group_id = len(self.groups) + 1
+                self.groups[group_id] = payload.get("transactions", [])
+                return 200, group_id
+        return 404, {"error": f"Not found: {method} {path}"}
+
+    def _insert(self, transactions: list[dict]) -> list[int]:
+        ids = []
+        for transaction in transactions:
+            key = (transaction.get("asset_id"), transaction.get("external_id"))
+            if key[1] and key in self.external_ids:
+                continue
+            self.external_ids.add(key)
+            transaction_id = len(self.transactions) + 1
+            self.transactions[transaction_id] = transaction
+            ids.append(transaction_id)
+        return ids
+
+
+def serve(budget: FakeLunchMoney, host: str = "127.0.0.1", port: int = 0) -> ThreadingHTTPServer:
+    """Start serving budget in a background thread, port 0 picks a free one."""
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        disable_nagle_algorithm = True
+
+        def _respond(self) -> None:
+            length = int(self.headers.get("Content-Length") or 0)
+            payload = json.loads(self.rfile.read(length) or b"{}")
+            status, body = budget.handle(self.command, self.path.split("?")[0], payload)
+            content = json.dumps(body).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(content)))
+            self.end_headers()
+            self.wfile.write(content)
+
+        do_GET = do_POST = do_PUT = _respond  # noqa: N815
+
+        def log_message(self, format: str, *args: object) -> None:  # noqa: A002
+            logger.debug(format, *args)
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+class RedirectTransport(httpx.HTTPTransport):
+    """Send lunch money requests to a fake server, keeping the duration of every request."""
+
+    def __init__(self, base_url: str) -> None:
+        """Initialize."""
+        super().__init__()
+        self.base_url = httpx.URL(base_url)
+        self.durations: list[float] = []
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        """Rewrite the request host, then time it."""
+        request.url = request.url.copy_with(
+            scheme=self.base_url.scheme,
+            host=self.base_url.host,
+            port=self.base_url.port,
+        )
+        started = time.perf_counter()
+        response = super().handle_request(request)
+        response.read()
+        self.durations.append(time.perf_counter() - started)
+        return response
+
+
+def asset(asset_id: int, name: str, currency: str, type_name: str = "cash") -> dict:
+    """Asset payload as returned by the API."""
+    return {
+        "id": asset_id,
+        "type_name": type_name,
+        "name": name,
+        "balance": "0",
+        "currency": currency,
+        "created_at": datetime.datetime.now(tz=datetime.UTC).isoformat(),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run a fake Lunch Money API.")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds per request")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of 500 responses")
+    parser.add_argument("--rate-limit", type=float, default=0.0, help="requests per second before 429")
+    args = parser.parse_args()
+
+    fake = FakeLunchMoney(
+        [asset(1, "CR001", "crc"), asset(2, "CR002", "crc"), asset(3, "PAYONEER", "usd")],
+        latency=args.latency,
+        error_rate=args.error_rate,
+        rate_limit=args.rate_limit,
+    )
+    httpd = serve(fake, port=args.port)
+    logger.info("Fake Lunch Money listening on http://127.0.0.1:%d", httpd.server_port)
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        httpd.shutdown()
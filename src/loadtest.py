@@ -0,0 +1,166 @@
+"""Load test the import path against the fake Lunch Money server."""
+
+import argparse
+import csv
+import datetime
+import logging
+import random
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from entities.bac import BACAccount
+from entities.payoneer import PayoneerAccount
+from entities.scotiabank import ScotiabankAccount
+from fakeserver import FakeLunchMoney, RedirectTransport, asset, serve
+from main import ENTITIES, import_profile
+from utils import LunchMoneyCR, config_logger
+
+logger = config_logger("loadtest.py")
+
+ASSETS = [
+    asset(1, "CR001", "crc"),
+    asset(2, "CR0000000000002", "crc"),
+    asset(3, "PAYONEER", "usd"),
+]
+START = datetime.date(2025, 1, 1)
+# share of synthetic rows that are debits.
+DEBIT_SHARE = 0.8
+
+
+def generate_bac_account(file_name: Path, rows: int, rng: random.Random) -> None:
+    """BAC account statement for CR001, with a running balance."""
+    balance = initial = 1_000_000.0
+    transactions = []
+    for i in range(rows):
+        debit, credit = (
+            (rng.randint(100, 50_000), 0) if rng.random() < DEBIT_SHARE else (0, rng.randint(10_000, 500_000))
+        )
+        balance += credit - debit
+        day = START + datetime.timedelta(days=i * 365 // max(rows, 1))
+        transactions.append(
+            [
+                day.strftime("%d/%m/%Y"),
+                100_000 + i,
+                "DB",
+                f"COMERCIO {i}",
+                f"{debit:.2f}",
+                f"{credit:.2f}",
+                f"{balance:.2f}",
+            ],
+        )
+    with file_name.open("w", encoding=BACAccount.encoding, newline="") as csvfile:
+        writer = csv.writer(csvfile)
+        writer.writerow(BACAccount.asset_field_names)
+        header = ["1", "LOAD TEST", "CR001", "CRC", f"{initial:.2f}", f"{balance:.2f}", "0", f"{balance:.2f}"]
+        writer.writerow(header + [""] * (len(BACAccount.asset_field_names) - len(header)))
+        writer.writerow([""] * len(BACAccount.transaction_field_names))
+        writer.writerow(BACAccount.transaction_field_names)
+        writer.writerow([""] * len(BACAccount.transaction_field_names))
+        writer.writerows(transactions)
+
+
+def generate_scotiabank_account(file_name: Path, rows: int, rng: random.Random) -> None:
+    """Scotiabank account movements for CR0000000000002, amounts in cents."""
+    with file_name.open("w", encoding=ScotiabankAccount.encoding, newline="") as csvfile:
+        writer = csv.writer(csvfile, delimiter=ScotiabankAccount.delimiter)
+        writer.writerow(ScotiabankAccount.transaction_field_names)
+        for i in range(rows):
+            day = START + datetime.timedelta(days=i * 365 // max(rows, 1))
+            kind = "D" if rng.random() < DEBIT_SHARE else "C"
+            cents = rng.randint(10_000, 5_000_000)
+            writer.writerow(
+                ["TR", kind, "CRC", "CR0000000000002", 200_000 + i, day.strftime("%d%m%Y"), cents, f"PAGO {i}"],
+            )
+
+
+def generate_payoneer_account(file_name: Path, rows: int, rng: random.Random) -> None:
+    """Payoneer activity, newest first as exported."""
+    with file_name.open("w", encoding=PayoneerAccount.encoding, newline="") as csvfile:
+        writer = csv.writer(csvfile)
+        writer.writerow(PayoneerAccount.transaction_field_names)
+        for i in reversed(range(rows)):
+            day = START + datetime.timedelta(days=i * 365 // max(rows, 1))
+            amount = f"{rng.randint(100, 500_000) / 100:,.2f}"
+            debit, credit = (amount, "") if rng.random() < DEBIT_SHARE else ("", amount)
+            row = [day.strftime("%m/%d/%Y"), "10:00", "UTC", 300_000 + i, f"PAYMENT {i}", credit, debit, "USD"]
+            writer.writerow(row + [""] * (len(PayoneerAccount.transaction_field_names) - len(row)))
+
+
+def percentile(durations: list[float], pct: int) -> float:
+    """Percentile of durations in milliseconds."""
+    if len(durations) < 2:  # noqa: PLR2004
+        return durations[0] * 1000 if durations else 0.0
+    return statistics.quantiles(durations, n=100)[pct - 1] * 1000
+
+
+def run(  # noqa: PLR0913
+    rows: int,
+    *,
+    latency: float = 0.0,
+    error_rate: float = 0.0,
+    rate_limit: float = 0.0,
+    deferred_balance: bool = False,
+    seed: int = 0,
+) -> None:
+    """Import synthetic statements into a fake budget and log throughput, latency and request counts."""
+    budget = FakeLunchMoney(ASSETS, latency=latency, error_rate=error_rate, rate_limit=rate_limit, seed=seed)
+    server = serve(budget)
+    transport = RedirectTransport(f"http://127.0.0.1:{server.server_port}")
+    rng = random.Random(seed)  # noqa: S311
+    try:
+        with tempfile.TemporaryDirectory() as datapath:
+            generate_bac_account(Path(datapath, "bac.csv"), rows, rng)
+            generate_scotiabank_account(Path(datapath, "scotiabank.txt"), rows, rng)
+            generate_payoneer_account(Path(datapath, "payoneer.csv"), rows, rng)
+            started = time.perf_counter()
+            lunch_money = LunchMoneyCR(
+                "fake-token",
+                deferred_balance=deferred_balance,
+                transport=transport,
+                assume_yes=True,
+            )
+            import_profile("loadtest", Path(datapath), lunch_money, [*ENTITIES, PayoneerAccount])
+            elapsed = time.perf_counter() - started
+    finally:
+        server.shutdown()
+        transport.close()
+
+    durations = transport.durations
+    inserted = len(budget.transactions)
+    # rows that never made it into the budget: failed requests given up on, or rejected rows.
+    logger.info("Rows: %d, inserted: %d, failed: %d, elapsed: %.2fs", rows * 3, inserted, rows * 3 - inserted, elapsed)
+    logger.info("Throughput: %.1f inserted rows/s, %.1f requests/s", inserted / elapsed, len(durations) / elapsed)
+    logger.info(
+        "Latency ms: p50 %.1f, p95 %.1f, p99 %.1f, max %.1f",
+        percentile(durations, 50),
+        percentile(durations, 95),
+        percentile(durations, 99),
+        max(durations, default=0.0) * 1000,
+    )
+    for (method, path, status), count in sorted(budget.requests.items()):
+        logger.info("Requests: %s %s %d - %d", method, path, status, count)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load test imports against a fake Lunch Money API.")
+    parser.add_argument("--rows", type=int, default=1000, help="transactions per synthetic file")
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds per request")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of 500 responses")
+    parser.add_argument("--rate-limit", type=float, default=0.0, help="requests per second before 429")
+    parser.add_argument("--deferred-balance", action="store_true")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    # per transaction lines would drown the report.
+    for name in ("entities/bac.py", "entities/scotiabank.py", "entities/payoneer.py"):
+        config_logger(name).setLevel(logging.WARNING)
+    run(
+        args.rows,
+        latency=args.latency,
+        error_rate=args.error_rate,
+        rate_limit=args.rate_limit,
+        deferred_balance=args.deferred_balance,
+        seed=args.seed,
+    )
@@ -3,10 +3,20 @@
 import argparse
 import configparser
 import pathlib
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import httpx
+from lunchable import LunchMoneyError
 
 from entities.bac import BACAccount, BACCreditCard
+from entities.base import Applied, Base, Statement, apply_stream
 from entities.scotiabank import ScotiabankAccount, ScotiabankCreditCard
+from merge import merge_by_asset
+from rules import Rules
+from transfers import group_transfers, match_transfers
 from utils import LunchMoneyCR, config_logger
+from warehouse import Warehouse
 
 ENTITIES = [
     BACAccount,
@@ -15,21 +25,79 @@ ENTITIES = [
     ScotiabankAccount,
 ]
 
+PROFILE_PREFIX = "lunchmoney:"
 
-def main(datapath: pathlib.Path, cfg: configparser.ConfigParser) -> None:
-    """Entrypoint."""
-    access_token = cfg["lunchmoney"].get("access_token", "")
-    lunch_money = LunchMoneyCR(access_token)
-    logger = config_logger("main.py")
+logger = config_logger("main.py")
+
+
+def profiles(datapath: pathlib.Path, cfg: configparser.ConfigParser) -> dict[str, pathlib.Path]:
+    """Config sections to import and their data directories.
+
+    Named profiles, "[lunchmoney:<name>]" sections, read files from their "datapath" option, relative to datapath and
+    defaulting to a "<name>" sub directory. Without named profiles "[lunchmoney]" reads datapath itself.
+    """
+    named = {
+        section: datapath / cfg[section].get("datapath", section.removeprefix(PROFILE_PREFIX))
+        for section in cfg.sections()
+        if section.startswith(PROFILE_PREFIX)
+    }
+    return named or {"lunchmoney": datapath}
+
+
+def warehouse_path(cfg: configparser.ConfigParser, section: str) -> pathlib.Path | None:
+    """Warehouse file of a profile, taken from [lunchmoney] when the profile has none."""
+    warehouse_file = cfg[section].get("warehouse", cfg["lunchmoney"].get("warehouse", ""))
+    return pathlib.Path(warehouse_file).resolve() if warehouse_file else None
+
+
+def lunch_money_client(
+    cfg: configparser.ConfigParser,
+    section: str,
+    transport: httpx.BaseTransport | None = None,
+    *,
+    assume_yes: bool = False,
+    warehouses: dict[pathlib.Path, Warehouse] | None = None,
+) -> LunchMoneyCR:
+    """Build the client of a profile, options missing in its section are taken from [lunchmoney].
+
+    Warehouses already open for the profile file are reused instead of opening another connection.
+    """
+    profile, defaults = cfg[section], cfg["lunchmoney"]
+    rules_file = profile.get("rules", defaults.get("rules", ""))
+    warehouse_file = warehouse_path(cfg, section)
+    transfer_window = profile.get("transfer_window", defaults.get("transfer_window", ""))
+    warehouse = ((warehouses or {}).get(warehouse_file) or Warehouse(warehouse_file)) if warehouse_file else None
+    return LunchMoneyCR(
+        profile.get("access_token", defaults.get("access_token", "")),
+        deferred_balance=profile.getboolean(
+            "deferred_balance",
+            fallback=defaults.getboolean("deferred_balance", fallback=False),
+        ),
+        rules=Rules.from_file(pathlib.Path(rules_file)) if rules_file else None,
+        apply_rules=profile.getboolean("apply_rules", fallback=defaults.getboolean("apply_rules", fallback=True)),
+        transport=transport,
+        warehouse=warehouse,
+        assume_yes=assume_yes,
+        transfer_window=int(transfer_window) if transfer_window else None,
+    )
 
-    for file_path in pathlib.Path(datapath).iterdir():
-        if not file_path.match("*.csv") and not file_path.match("*.txt"):
+
+def parse_files(
+    section: str,
+    datapath: pathlib.Path,
+    lunch_money: LunchMoneyCR,
+    entity_types: list[type[Base]] = ENTITIES,
+) -> list[Statement]:
+    """Infer the entity of every file found in datapath and parse its transactions."""
+    statements: list[Statement] = []
+    for file_path in sorted(pathlib.Path(datapath).iterdir()):
+        if not any(file_path.match(pattern) for pattern in ("*.csv", "*.txt", "*.xlsx")):
             continue
-        logger.info("\nFile: %s", file_path)
+        logger.info("\n%s File: %s", section, file_path)
         inferred_assets = []
         inferred_entity = None
 
-        for e in ENTITIES:
+        for e in entity_types:
             inferred_assets = e.infer(lunch_money, file_path)
             inferred_entity = e
             if inferred_assets:
@@ -37,7 +105,7 @@ def main(datapath: pathlib.Path, cfg: configparser.ConfigParser) -> None:
 
         if not inferred_entity:
             logger.error("Entity not infered.")
-            return
+            return statements
 
         for asset in inferred_assets:
             fields = ["id", "institution_name", "name", "display_name"]
@@ -46,8 +114,71 @@ def main(datapath: pathlib.Path, cfg: configparser.ConfigParser) -> None:
         if not inferred_assets:
             logger.warning("No entity detected for this file")
             continue
-        instance = inferred_entity(lunch_money, file_path)
-        instance.insert_transactions()
+        entity = inferred_entity(lunch_money, file_path)
+        transactions = entity.transactions()
+        # a truncated or gapped statement is left out entirely instead of being half imported.
+        if not entity.validate(transactions):
+            logger.error("Inconsistent balances, file skipped: %s", file_path)
+            continue
+        statements.append((entity, transactions))
+    return statements
+
+
+def import_profile(
+    section: str,
+    datapath: pathlib.Path,
+    lunch_money: LunchMoneyCR,
+    entity_types: list[type[Base]] = ENTITIES,
+) -> None:
+    """Import every file found in datapath into the profile budget, one merged stream per asset.
+
+    With a transfer window, payments between imported assets are matched before submitting and grouped afterwards.
+    """
+    assets = {a.id: a for a in lunch_money.cached_assets}
+    streams = merge_by_asset(parse_files(section, datapath, lunch_money, entity_types))
+    transfer_window = lunch_money.transfer_window
+    transfers = match_transfers(streams, transfer_window) if transfer_window is not None else []
+    if transfers:
+        logger.info("\n%s Transfers matched: %d", section, len(transfers))
+    applied: Applied = []
+    for asset_id, stream in streams.items():
+        asset = assets[asset_id]
+        files = {entity.file_name for entity, _ in stream}
+        logger.info(
+            "\n%s Asset: %s | %s - %d transactions from %d files",
+            section,
+            asset.name,
+            asset.currency,
+            len(stream),
+            len(files),
+        )
+        applied += apply_stream(lunch_money, stream, f"{asset.name} ({asset.currency})")
+    if transfers:
+        group_transfers(lunch_money, transfers, applied)
+
+
+def main(datapath: pathlib.Path, cfg: configparser.ConfigParser, *, assume_yes: bool = False) -> None:
+    """Entrypoint."""
+    datapaths = profiles(datapath, cfg)
+    # profiles writing to the same file share one warehouse, which serialises their writes.
+    warehouses = {path: Warehouse(path) for path in {warehouse_path(cfg, section) for section in datapaths} if path}
+
+    def run(section: str) -> None:
+        lunch_money = lunch_money_client(cfg, section, transport, assume_yes=assume_yes, warehouses=warehouses)
+        import_profile(section, datapaths[section], lunch_money)
+
+    # profiles share one connection pool and are submitted concurrently.
+    try:
+        with httpx.HTTPTransport() as transport, ThreadPoolExecutor(max_workers=len(datapaths)) as executor:
+            futures = {executor.submit(run, section): section for section in datapaths}
+            for future in as_completed(futures):
+                try:
+                    future.result()
+                except (LunchMoneyError, OSError, sqlite3.Error):
+                    logger.exception("%s - import failed", futures[future])
+    finally:
+        for warehouse in warehouses.values():
+            warehouse.close()
 
 
 if __name__ == "__main__":
@@ -56,6 +187,7 @@ if __name__ == "__main__":
 
     parser = argparse.ArgumentParser()
     parser.add_argument("datapath", type=pathlib.Path)
+    parser.add_argument("-y", "--yes", action="store_true", help="import without asking for confirmation")
     args = parser.parse_args()
 
-    main(args.datapath, config)
+    main(args.datapath, config, assume_yes=args.yes)
@@ -0,0 +1,57 @@
+"""Merge overlapping statements of the same asset."""
+
+import heapq
+from collections import Counter
+from collections.abc import Iterable
+from pathlib import Path
+
+from entities.base import Base, Statement, Stream
+from utils import config_logger
+
+logger = config_logger("merge.py")
+
+
+def merge_by_asset(statements: list[Statement]) -> dict[int, Stream]:
+    """Group parsed statements by asset and merge them into one deduplicated stream per asset.
+
+    Every statement is already sorted by date, so streams are k-way merged by date and duplicates (same external id)
+    are dropped in the same linear pass.
+    """
+    streams: dict[int, list[Stream]] = {}
+    for entity, transactions in statements:
+        by_asset: dict[int, Stream] = {}
+        dropped = 0
+        for transaction in transactions:
+            asset = entity.transaction_asset(transaction)
+            if asset:
+                by_asset.setdefault(asset.id, []).append((entity, transaction))
+            else:
+                dropped += 1
+        if dropped:
+            logger.warning("%s - %d transactions without asset skipped", Path(entity.file_name).name, dropped)
+        for asset_id, stream in by_asset.items():
+            streams.setdefault(asset_id, []).append(stream)
+    return {
+        asset_id: dedupe(heapq.merge(*asset_streams, key=lambda pair: pair[0].transaction_date(pair[1])))
+        for asset_id, asset_streams in streams.items()
+    }
+
+
+def dedupe(stream: Iterable[tuple[Base, dict]]) -> Stream:
+    """Drop transactions already seen in another file, by external id.
+
+    Repeats inside one file are real (e.g. two identical charges the same day), so the n-th copy of an external id in a
+    file is only dropped when some other file already had an n-th copy.
+    """
+    seen: set[tuple[str, int]] = set()
+    copies: Counter[tuple[Base, str]] = Counter()
+    deduped: Stream = []
+    for entity, transaction in stream:
+        external_id = entity.transaction_external_id(transaction)
+        key = (external_id, copies[entity, external_id])
+        copies[entity, external_id] += 1
+        if key in seen:
+            continue
+        seen.add(key)
+        deduped.append((entity, transaction))
+    return deduped
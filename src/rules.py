@@ -0,0 +1,107 @@
+"""Local payee and category rules."""
+
+import configparser
+import unicodedata
+from collections import deque
+from pathlib import Path
+from typing import NamedTuple
+
+
+class Rule(NamedTuple):
+    """Payee and category assigned to transactions matching any of the patterns."""
+
+    payee: str
+    category: str
+    patterns: list[str]
+
+
+def normalize(value: str) -> str:
+    """Uppercase, strip accents and collapse whitespace so bank strings compare equal."""
+    value = unicodedata.normalize("NFKD", value).encode("ascii", "ignore").decode("ascii")
+    return " ".join(value.upper().split())
+
+
+class Rules:
+    """Merchant patterns compiled into a single Aho-Corasick automaton.
+
+    Matching walks the text once, so its cost depends on the text length and not on the number of patterns.
+    When several patterns match, the longest one wins, then the rule defined first.
+    """
+
+    def __init__(self, rules: list[Rule]) -> None:
+        """Initialize."""
+        self.rules = rules
+        self._goto: list[dict[str, int]] = [{}]
+        self._fail: list[int] = [0]
+        # best (-pattern length, rule index) ending at each node, None when no pattern ends there.
+        self._output: list[tuple[int, int] | None] = [None]
+        for index, rule in enumerate(rules):
+            for pattern in rule.patterns:
+                self._add(normalize(pattern), index)
+        self._link()
+
+    @staticmethod
+    def from_file(file_name: Path) -> "Rules":
+        """Load rules from a config file, one section per payee.
+
+        [Auto Mercado]
+        patterns = AUTOMERCADO, AUTO MERCADO
+        category = Groceries
+        """
+        # merchant patterns may contain "%".
+        cfg = configparser.ConfigParser(interpolation=None)
+        with Path(file_name).open(encoding="utf-8") as rules_file:
+            cfg.read_file(rules_file)
+        return Rules(
+            [
+                Rule(
+                    payee=section,
+                    category=cfg[section].get("category", ""),
+                    patterns=[p.strip() for p in cfg[section].get("patterns", "").split(",") if p.strip()],
+                )
+                for section in cfg.sections()
+            ],
+        )
+
+    def match(self, text: str) -> Rule | None:
+        """Return the rule matching text, if any."""
+        node = 0
+        best: tuple[int, int] | None = None
+        for char in normalize(text):
+            while node and char not in self._goto[node]:
+                node = self._fail[node]
+            node = self._goto[node].get(char, 0)
+            output = self._output[node]
+            if output and (not best or output < best):
+                best = output
+        return self.rules[best[1]] if best else None
+
+    def _add(self, pattern: str, index: int) -> None:
+        if not pattern:
+            return
+        node = 0
+        for char in pattern:
+            if char not in self._goto[node]:
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append(None)
+                self._goto[node][char] = len(self._goto) - 1
+            node = self._goto[node][char]
+        candidate = (-len(pattern), index)
+        if not self._output[node] or candidate < self._output[node]:
+            self._output[node] = candidate
+
+    def _link(self) -> None:
+        """Build failure links breadth first, carrying over the best output of each suffix."""
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self._goto[node].items():
+                queue.append(child)
+                fail = self._fail[node]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[child] = self._goto[fail].get(char, 0)
+                inherited = self._output[self._fail[child]]
+                if inherited and (not self._output[child] or inherited < self._output[child]):
+                    self._output[child] = inherited
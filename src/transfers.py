@@ -0,0 +1,128 @@
+"""Match transfers between imported assets."""
+
+import bisect
+import datetime
+import itertools
+from typing import NamedTuple
+
+import click
+from lunchable.exceptions import LunchMoneyHTTPError
+
+from entities.bac import BACAccount, BACCreditCard
+from entities.base import CONFIRM_LOCK, Applied, Base, Stream
+from entities.scotiabank import ScotiabankAccount, ScotiabankCreditCard
+from utils import LunchMoneyCR, config_logger
+
+logger = config_logger("transfers.py")
+
+TRANSFER_PAYEE = "Transfer"
+ACCOUNTS = (BACAccount, ScotiabankAccount)
+CREDIT_CARDS = (BACCreditCard, ScotiabankCreditCard)
+# (paying, receiving) entities that move money between own assets, other equal amounts are coincidences or refunds.
+FLOWS: set[tuple[type[Base], type[Base]]] = set(itertools.product(ACCOUNTS, CREDIT_CARDS))
+
+
+class Leg(NamedTuple):
+    """One side of a transfer."""
+
+    date: datetime.date
+    asset_id: int
+    entity: Base
+    transaction: dict
+
+
+class Transfer(NamedTuple):
+    """Money leaving an asset and arriving to another one."""
+
+    outflow: Leg
+    inflow: Leg
+
+
+def _cents(amount: float) -> int:
+    return round(abs(amount) * 100)
+
+
+def match_transfers(streams: dict[int, Stream], window: int) -> list[Transfer]:
+    """Pair outflows with inflows of the same amount and currency, at most window days apart, along FLOWS.
+
+    Inflows are indexed by (currency, amount) and sorted by date, so every outflow only looks at the candidates inside
+    its date window instead of scanning all transactions. The closest date wins and every inflow is used once.
+    """
+    index: dict[tuple[str, int], list[Leg]] = {}
+    outflows: list[tuple[str, int, Leg]] = []
+    for asset_id, stream in streams.items():
+        for entity, transaction in stream:
+            _asset = entity.transaction_asset(transaction)
+            inflow = entity.transaction_inflow(transaction)
+            if not _asset or not inflow:
+                continue
+            leg = Leg(entity.transaction_date(transaction), asset_id, entity, transaction)
+            if inflow > 0:
+                index.setdefault((_asset.currency, _cents(inflow)), []).append(leg)
+            else:
+                outflows.append((_asset.currency, _cents(inflow), leg))
+
+    dates: dict[tuple[str, int], list[datetime.date]] = {}
+    for key, legs in index.items():
+        legs.sort(key=lambda leg: leg.date)
+        dates[key] = [leg.date for leg in legs]
+
+    used: set[tuple[tuple[str, int], int]] = set()
+    transfers = []
+    for currency, cents, outflow in sorted(outflows, key=lambda o: o[2].date):
+        key = (currency, cents)
+        if key not in index:
+            continue
+        delta = datetime.timedelta(days=window)
+        start = bisect.bisect_left(dates[key], outflow.date - delta)
+        end = bisect.bisect_right(dates[key], outflow.date + delta)
+        candidates = [
+            i
+            for i in range(start, end)
+            if (key, i) not in used and (type(outflow.entity), type(index[key][i].entity)) in FLOWS
+        ]
+        if not candidates:
+            continue
+        best = min(candidates, key=lambda i: abs((index[key][i].date - outflow.date).days))
+        used.add((key, best))
+        transfers.append(Transfer(outflow, index[key][best]))
+    return transfers
+
+
+def group_transfers(lunch_money: LunchMoneyCR, transfers: list[Transfer], applied: Applied) -> None:
+    """Group both sides of every transfer inserted in this run, once confirmed."""
+    ids = {id(transaction): result[0] for _, transaction, result in applied}
+    assets = {a.id: a for a in lunch_money.cached_assets}
+    pending = []
+    for transfer in transfers:
+        outflow_id, inflow_id = ids.get(id(transfer.outflow.transaction)), ids.get(id(transfer.inflow.transaction))
+        if outflow_id is None or inflow_id is None:
+            continue
+        notes = f"{assets[transfer.outflow.asset_id].name} -> {assets[transfer.inflow.asset_id].name}"
+        logger.info(
+            "Transfer: %s | %.2f | paid %s, received %s",
+            notes,
+            transfer.inflow.entity.transaction_inflow(transfer.inflow.transaction),
+            transfer.outflow.date.isoformat(),
+            transfer.inflow.date.isoformat(),
+        )
+        pending.append((transfer, [outflow_id, inflow_id], notes))
+    if not pending:
+        return
+    with CONFIRM_LOCK:
+        if not lunch_money.assume_yes and not click.confirm(f"{len(pending)} transfers - Do you want to group them?"):
+            return
+    grouped = 0
+    for transfer, leg_ids, notes in pending:
+        try:
+            lunch_money.insert_transaction_group(
+                date=transfer.outflow.date,
+                payee=TRANSFER_PAYEE,
+                transactions=leg_ids,
+                notes=notes,
+            )
+        except LunchMoneyHTTPError as exception:
+            logger.warning("Could not group transfer %s: %s", leg_ids, exception)
+            continue
+        grouped += 1
+    logger.info("Transfers grouped: %d of %d matched", grouped, len(transfers))
@@ -1,16 +1,27 @@
 """Utilities module."""
 
+import atexit
+import datetime
 import logging
+import logging.handlers
 import os
+import queue
 import re
+import time
 import unicodedata
+from functools import cache, cached_property
 from typing import TYPE_CHECKING
 
+import httpx
 from lunchable import LunchMoney
 
 if TYPE_CHECKING:
+    from lunchable import TransactionInsertObject
     from lunchable.models import AssetsObject
 
+    from rules import Rules
+    from warehouse import Warehouse
+
 logging.getLogger("lunchable.models._core").disabled = True
 
 
@@ -22,31 +33,142 @@ def _float(x: str) -> float:
     return float(x.strip())
 
 
+LOG_FORMAT = "%(asctime)s - %(name)s.%(levelname)s - %(filename)s:%(lineno)d - %(message)s"
+LOG_QUEUE: queue.SimpleQueue = queue.SimpleQueue()
+# with PROGRESS=True per row lines are logged as debug and replaced by an aggregated progress line.
+PROGRESS: bool = os.environ.get("PROGRESS", "False").capitalize() == "True"
+ROW_LEVEL: int = logging.DEBUG if PROGRESS else logging.INFO
+PROGRESS_INTERVAL = 2.0
+
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    """Queue records untouched, so formatting happens in the listener thread too."""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        """Skip the default formatting done by QueueHandler."""
+        return record
+
+
+@cache
+def _log_listener() -> logging.handlers.QueueListener:
+    """Start the background thread formatting and writing log records, once."""
+    handler = logging.StreamHandler()
+    handler.setFormatter(logging.Formatter(LOG_FORMAT))
+    listener = logging.handlers.QueueListener(LOG_QUEUE, handler)
+    listener.start()
+    atexit.register(listener.stop)
+    return listener
+
+
 def config_logger(name: str = "") -> logging.Logger:
-    """Configure a logger."""
+    """Configure a logger, its records are written by a background thread."""
     if logging.getLogger(name).hasHandlers():
         return logging.getLogger(name)
 
     level: int = logging.DEBUG if os.environ.get("DEBUG", "False").capitalize() == "True" else logging.INFO
-    _format: str = "%(asctime)s - %(name)s.%(levelname)s - %(filename)s:%(lineno)d - %(message)s"
-    handler = logging.StreamHandler
+    _log_listener()
 
-    _handler = handler()
-    _handler.setFormatter(logging.Formatter(_format))
     _logger = logging.getLogger(name)
-    _logger.addHandler(_handler)
+    _logger.addHandler(_QueueHandler(LOG_QUEUE))
     _logger.setLevel(level)
     _logger.propagate = False
     return _logger
 
 
+logger = config_logger("utils.py")
+
+
+class Progress:
+    """Aggregated progress line, logged at most once every PROGRESS_INTERVAL seconds."""
+
+    def __init__(self, _logger: logging.Logger, total: int) -> None:
+        """Initialize."""
+        self.logger = _logger
+        self.total = total
+        self.done = 0
+        self.applied = 0
+        self.started = self.logged = time.monotonic()
+
+    def update(self, *, applied: bool) -> None:
+        """Count a processed row and log progress when due."""
+        self.done += 1
+        self.applied += applied
+        now = time.monotonic()
+        if now - self.logged < PROGRESS_INTERVAL and self.done < self.total:
+            return
+        self.logged = now
+        rate = self.done / max(now - self.started, 1e-6)
+        eta = (self.total - self.done) / rate
+        self.logger.info(
+            "Progress: %d/%d rows, %d applied, %.1f rows/s, ETA %.0fs",
+            self.done,
+            self.total,
+            self.applied,
+            rate,
+            eta,
+        )
+
+
 class LunchMoneyCR(LunchMoney):
     """LunchMoney wrapper to include custom logic."""
 
-    def __init__(self, access_token: str) -> None:
+    def __init__(  # noqa: PLR0913
+        self,
+        access_token: str,
+        *,
+        deferred_balance: bool = False,
+        rules: "Rules | None" = None,
+        apply_rules: bool = True,
+        transport: httpx.BaseTransport | None = None,
+        warehouse: "Warehouse | None" = None,
+        assume_yes: bool = False,
+        transfer_window: int | None = None,
+    ) -> None:
         """Initialize."""
         super().__init__(access_token)
+        if transport:
+            # keep lunchable's headers and timeouts, but send requests through a connection pool shared by profiles.
+            default_session = self.session
+            self.session = httpx.Client(
+                transport=transport,
+                timeout=default_session.timeout,
+                headers=default_session.headers,
+            )
+            default_session.close()
         self.cached_assets: list[AssetsObject] = self.get_assets()
+        self.deferred_balance = deferred_balance
+        self.rules = rules
+        self.apply_rules = apply_rules
+        self.warehouse = warehouse
+        self.assume_yes = assume_yes
+        self.transfer_window = transfer_window
+
+    @cached_property
+    def cached_categories(self) -> dict[str, int]:
+        """Category ids by lowercase name, fetched on first use."""
+        return {c.name.lower(): c.id for c in self.get_categories()}
+
+    def categorize(self, transaction_insert: "TransactionInsertObject") -> None:
+        """Fill payee and category from local rules before submission."""
+        rule = self.rules.match(transaction_insert.notes or "") if self.rules else None
+        if not rule:
+            return
+        transaction_insert.payee = rule.payee
+        if rule.category:
+            transaction_insert.category_id = self.cached_categories.get(rule.category.lower())
+            if not transaction_insert.category_id:
+                logger.debug("Category not found: %s", rule.category)
+
+    def set_asset_balance(
+        self,
+        asset_id: int,
+        balance: float,
+        balance_as_of: datetime.datetime | None = None,
+    ) -> "AssetsObject":
+        """Update an asset balance, as of now by default, and refresh it in cached assets."""
+        asset = self.update_asset(asset_id, balance=balance, balance_as_of=balance_as_of)
+        self.cached_assets = [asset if a.id == asset_id else a for a in self.cached_assets]
+        return asset
 
 
 def slugify(value: str | float) -> str:
@@ -0,0 +1,163 @@
+"""Local transaction warehouse."""
+
+import argparse
+import csv
+import datetime
+import sqlite3
+import sys
+import threading
+from pathlib import Path
+from typing import TextIO
+
+from lunchable import TransactionInsertObject
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS transactions (
+    asset_id INTEGER NOT NULL,
+    asset_name TEXT NOT NULL,
+    external_id TEXT NOT NULL,
+    date TEXT NOT NULL,
+    amount REAL NOT NULL,
+    currency TEXT,
+    payee TEXT,
+    notes TEXT,
+    category_id INTEGER,
+    lunch_money_id INTEGER,
+    source_file TEXT,
+    imported_at TEXT NOT NULL,
+    PRIMARY KEY (asset_id, external_id)
+);
+CREATE INDEX IF NOT EXISTS transactions_asset_date ON transactions (asset_id, date);
+CREATE INDEX IF NOT EXISTS transactions_date ON transactions (date);
+CREATE INDEX IF NOT EXISTS transactions_external_id ON transactions (external_id);
+"""
+COLUMNS = [
+    "asset_id",
+    "asset_name",
+    "external_id",
+    "date",
+    "amount",
+    "currency",
+    "payee",
+    "notes",
+    "category_id",
+    "lunch_money_id",
+    "source_file",
+    "imported_at",
+]
+
+
+class Warehouse:
+    """SQLite store of every transaction sent to lunch money.
+
+    Amounts are signed, debits are negative. Re-runs look transactions up here instead of sending them again.
+    Every record is committed right away, so an interrupted import keeps what it already sent. One instance can be
+    shared by threads, statements are serialised by its lock.
+    """
+
+    def __init__(self, file_name: Path) -> None:
+        """Initialize."""
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(file_name, check_same_thread=False)
+        self.connection.row_factory = sqlite3.Row
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        # with WAL, commits only wait for the disk on checkpoints.
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.executescript(SCHEMA)
+
+    def close(self) -> None:
+        """Close the database."""
+        with self.lock:
+            self.connection.close()
+
+    def imported(self, asset_id: int, external_id: str) -> bool:
+        """Tell if a transaction was already inserted into lunch money."""
+        with self.lock:
+            row = self.connection.execute(
+                "SELECT 1 FROM transactions WHERE asset_id = ? AND external_id = ? AND lunch_money_id IS NOT NULL",
+                (asset_id, external_id),
+            ).fetchone()
+        return row is not None
+
+    def record(
+        self,
+        transaction_insert: TransactionInsertObject,
+        *,
+        debit_as_negative: bool,
+        asset_name: str,
+        lunch_money_ids: list[int],
+        source_file: Path,
+    ) -> None:
+        """Store a normalised transaction, keeping the lunch money id of earlier runs."""
+        amount = transaction_insert.amount if debit_as_negative else -transaction_insert.amount
+        with self.lock, self.connection:
+            self.connection.execute(
+                f"INSERT INTO transactions ({', '.join(COLUMNS)}) VALUES ({', '.join('?' * len(COLUMNS))}) "  # noqa: S608
+                "ON CONFLICT (asset_id, external_id) DO UPDATE SET "
+                "lunch_money_id = coalesce(excluded.lunch_money_id, lunch_money_id), "
+                "payee = excluded.payee, category_id = excluded.category_id, imported_at = excluded.imported_at",
+                (
+                    transaction_insert.asset_id,
+                    asset_name,
+                    transaction_insert.external_id,
+                    transaction_insert.date.isoformat(),
+                    amount,
+                    transaction_insert.currency,
+                    transaction_insert.payee,
+                    transaction_insert.notes,
+                    transaction_insert.category_id,
+                    lunch_money_ids[0] if lunch_money_ids else None,
+                    str(source_file),
+                    datetime.datetime.now(tz=datetime.UTC).isoformat(),
+                ),
+            )
+
+    def query(
+        self,
+        asset: str = "",
+        start: datetime.date | None = None,
+        end: datetime.date | None = None,
+    ) -> list[sqlite3.Row]:
+        """Transactions of an asset (id or part of its name) between two dates, both included."""
+        clauses, params = [], []
+        if asset:
+            clauses.append("(asset_id = ? OR asset_name LIKE ?)")
+            params += [int(asset) if asset.isdigit() else -1, f"%{asset}%"]
+        if start:
+            clauses.append("date >= ?")
+            params.append(start.isoformat())
+        if end:
+            clauses.append("date <= ?")
+            params.append(end.isoformat())
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        with self.lock:
+            return self.connection.execute(
+                f"SELECT {', '.join(COLUMNS)} FROM transactions {where} ORDER BY date, asset_id",  # noqa: S608
+                params,
+            ).fetchall()
+
+
+def export(rows: list[sqlite3.Row], output: TextIO) -> None:
+    """Write rows as CSV."""
+    writer = csv.writer(output)
+    writer.writerow(COLUMNS)
+    writer.writerows(tuple(row) for row in rows)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Query the local transaction warehouse.")
+    parser.add_argument("database", type=Path)
+    parser.add_argument("--asset", default="", help="asset id or part of its name")
+    parser.add_argument("--start", type=datetime.date.fromisoformat, help="YYYY-MM-DD")
+    parser.add_argument("--end", type=datetime.date.fromisoformat, help="YYYY-MM-DD")
+    parser.add_argument("--output", type=Path, help="CSV file, stdout by default")
+    args = parser.parse_args()
+
+    warehouse = Warehouse(args.database)
+    results = warehouse.query(args.asset, args.start, args.end)
+    if args.output:
+        with args.output.open("w", encoding="utf-8", newline="") as csvfile:
+            export(results, csvfile)
+    else:
+        export(results, sys.stdout)
+    warehouse.close()
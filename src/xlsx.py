@@ -0,0 +1,174 @@
+"""Streaming XLSX reader built on the standard library."""
+
+import datetime
+import posixpath
+import re
+import zipfile
+from collections.abc import Iterator
+from pathlib import Path
+from typing import IO
+from xml.etree import ElementTree as ET
+
+NS = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+REL_NS = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}"
+PACKAGE_REL_NS = "{http://schemas.openxmlformats.org/package/2006/relationships}"
+# built-in number formats that render dates.
+DATE_FORMAT_IDS = {*range(14, 23), *range(27, 37), *range(45, 48), *range(50, 59)}
+DATE_FORMAT = "%d/%m/%Y"
+EXCEL_EPOCH = datetime.datetime(1899, 12, 30, tzinfo=datetime.UTC)
+# workbooks flagged date1904 (old Mac Excel) count days from here.
+EXCEL_1904_EPOCH = datetime.datetime(1904, 1, 1, tzinfo=datetime.UTC)
+
+
+class DictReader:
+    """Map XLSX rows to dicts the same way csv.DictReader does with explicit field names.
+
+    Rows are parsed one at a time from every worksheet in workbook order, so memory does not grow with the number of
+    rows or sheets, only with the shared strings table.
+    """
+
+    def __init__(self, file_name: Path, fieldnames: list) -> None:
+        """Initialize."""
+        self.file_name = file_name
+        self.fieldnames = fieldnames
+
+    def __iter__(self) -> Iterator[dict]:
+        """Yield one dict per non empty row."""
+        for row in iter_rows(self.file_name):
+            if not row:
+                continue
+            record = dict(zip(self.fieldnames, row, strict=False))
+            if len(row) > len(self.fieldnames):
+                record[None] = row[len(self.fieldnames) :]
+            for field in self.fieldnames[len(row) :]:
+                record[field] = None
+            yield record
+
+
+def iter_rows(file_name: Path) -> Iterator[list[str]]:
+    """Yield every row of every worksheet as a list of cell values."""
+    with zipfile.ZipFile(file_name) as workbook:
+        shared_strings = _shared_strings(workbook)
+        date_styles = _date_styles(workbook)
+        epoch = _epoch(workbook)
+        for sheet in _sheets(workbook):
+            with workbook.open(sheet) as sheet_file:
+                yield from _sheet_rows(sheet_file, shared_strings, date_styles, epoch)
+
+
+def _sheets(workbook: zipfile.ZipFile) -> list[str]:
+    """Worksheet paths in workbook order."""
+    names = set(workbook.namelist())
+    try:
+        with workbook.open("xl/_rels/workbook.xml.rels") as rels_file:
+            targets = {
+                rel.get("Id"): rel.get("Target", "")
+                for rel in ET.parse(rels_file).getroot().iter(f"{PACKAGE_REL_NS}Relationship")  # noqa: S314
+            }
+        with workbook.open("xl/workbook.xml") as workbook_file:
+            ids = [sheet.get(f"{REL_NS}id") for sheet in ET.parse(workbook_file).getroot().iter(f"{NS}sheet")]  # noqa: S314
+    except KeyError:
+        ids, targets = [], {}
+    sheets = []
+    for rel_id in ids:
+        target = targets.get(rel_id, "")
+        path = target.lstrip("/") if target.startswith("/") else posixpath.normpath(posixpath.join("xl", target))
+        if path in names:
+            sheets.append(path)
+    if sheets:
+        return sheets
+    found = [n for n in names if re.fullmatch(r"xl/worksheets/sheet\d+\.xml", n)]
+    return sorted(found, key=lambda n: int(re.sub(r"\D", "", n)))
+
+
+def _epoch(workbook: zipfile.ZipFile) -> datetime.datetime:
+    """Day zero of date serial numbers."""
+    try:
+        with workbook.open("xl/workbook.xml") as workbook_file:
+            properties = ET.parse(workbook_file).getroot().find(f"{NS}workbookPr")  # noqa: S314
+    except KeyError:
+        return EXCEL_EPOCH
+    date1904 = properties is not None and properties.get("date1904", "0").lower() in {"1", "true"}
+    return EXCEL_1904_EPOCH if date1904 else EXCEL_EPOCH
+
+
+def _shared_strings(workbook: zipfile.ZipFile) -> list[str]:
+    if "xl/sharedStrings.xml" not in workbook.namelist():
+        return []
+    strings = []
+    with workbook.open("xl/sharedStrings.xml") as strings_file:
+        for _, elem in ET.iterparse(strings_file):  # noqa: S314
+            if elem.tag == f"{NS}si":
+                # plain text or rich text runs, phonetic hints (rPh) are not part of the value.
+                runs = [elem.findtext(f"{NS}t") or "", *(r.findtext(f"{NS}t") or "" for r in elem.iterfind(f"{NS}r"))]
+                strings.append("".join(runs))
+                elem.clear()
+    return strings
+
+
+def _date_styles(workbook: zipfile.ZipFile) -> set[int]:
+    """Indexes of the cell styles whose number format is a date."""
+    if "xl/styles.xml" not in workbook.namelist():
+        return set()
+    with workbook.open("xl/styles.xml") as styles_file:
+        root = ET.parse(styles_file).getroot()  # noqa: S314
+    date_formats = set(DATE_FORMAT_IDS)
+    for num_fmt in root.iter(f"{NS}numFmt"):
+        # drop quoted literals, escaped chars and [color]/[locale] sections before looking for date parts.
+        code = re.sub(r'"[^"]*"|\\.|\[[^\]]*\]', "", num_fmt.get("formatCode", "")).lower()
+        if re.search(r"[dmy]", code):
+            date_formats.add(int(num_fmt.get("numFmtId", "0")))
+    cell_xfs = root.find(f"{NS}cellXfs")
+    if cell_xfs is None:
+        return set()
+    return {i for i, xf in enumerate(cell_xfs.iter(f"{NS}xf")) if int(xf.get("numFmtId", "0")) in date_formats}
+
+
+def _sheet_rows(
+    sheet_file: IO[bytes],
+    shared_strings: list[str],
+    date_styles: set[int],
+    epoch: datetime.datetime,
+) -> Iterator[list[str]]:
+    sheet_data = None
+    for event, elem in ET.iterparse(sheet_file, events=("start", "end")):  # noqa: S314
+        if event == "start":
+            if elem.tag == f"{NS}sheetData":
+                sheet_data = elem
+            continue
+        if elem.tag != f"{NS}row":
+            continue
+        row: list[str] = []
+        for cell in elem.iter(f"{NS}c"):
+            column = _column(cell.get("r", ""), len(row))
+            row.extend([""] * (column - len(row)))
+            row.append(_value(cell, shared_strings, date_styles, epoch))
+        yield row
+        # drop parsed rows so memory stays flat regardless of the sheet size.
+        if sheet_data is not None:
+            sheet_data.clear()
+
+
+def _column(reference: str, default: int) -> int:
+    """Zero based column index from a cell reference like "AB12"."""
+    letters = re.sub(r"[^A-Z]", "", reference)
+    if not letters:
+        return default
+    index = 0
+    for letter in letters:
+        index = index * 26 + ord(letter) - ord("A") + 1
+    return index - 1
+
+
+def _value(cell: ET.Element, shared_strings: list[str], date_styles: set[int], epoch: datetime.datetime) -> str:
+    cell_type = cell.get("t", "n")
+    if cell_type == "inlineStr":
+        return "".join(t.text or "" for t in cell.iter(f"{NS}t"))
+    value = cell.findtext(f"{NS}v") or ""
+    if cell_type == "s":
+        return shared_strings[int(value)] if value else ""
+    if cell_type == "b":
+        return "TRUE" if value == "1" else "FALSE"
+    if cell_type == "n" and value and int(cell.get("s", "0")) in date_styles:
+        return (epoch + datetime.timedelta(days=float(value))).strftime(DATE_FORMAT)
+    return value
@@ -0,0 +1,106 @@
+"""Shared fixtures: statement writers and a fake Lunch Money budget."""
+
+from collections.abc import Callable, Iterator
+from pathlib import Path
+
+import pytest
+
+from entities.bac import BACAccount
+from fakeserver import FakeLunchMoney, RedirectTransport, asset, serve
+from utils import LunchMoneyCR
+
+ASSETS = [
+    asset(1, "CR001", "crc"),
+    asset(2, "VISA 1234", "crc", "credit"),
+    asset(3, "CR0000000000002", "crc"),
+    asset(4, "PAYONEER", "usd"),
+]
+
+# (date DD/MM/YYYY, description, debit, credit)
+type Movement = tuple[str, str, float, float]
+type BACRow = list[str]
+
+
+def bac_rows(initial: float, movements: list[Movement]) -> list[BACRow]:
+    """BAC account transaction rows with their running balance."""
+    rows, balance = [], initial
+    for reference, (day, description, debit, credit) in enumerate(movements, start=100):
+        balance += credit - debit
+        rows.append(
+            [
+                day,
+                str(reference),
+                "DB" if debit else "CR",
+                description,
+                f"{debit:.2f}",
+                f"{credit:.2f}",
+                f"{balance:.2f}",
+            ],
+        )
+    return rows
+
+
+def write_bac_account(
+    path: Path,
+    rows: list[BACRow],
+    *,
+    initial: float | None,
+    total: float | None = None,
+    product: str = "CR001",
+) -> Path:
+    """Write a BAC account statement, the header totals default to the rows running balance."""
+    total = float(rows[-1][-1]) if total is None else total
+    header = [
+        "1",
+        "JOHN",
+        product,
+        "CRC",
+        "" if initial is None else f"{initial:.2f}",
+        f"{total:.2f}",
+        "0",
+        f"{total:.2f}",
+    ]
+    lines = [
+        ",".join(BACAccount.asset_field_names),
+        ",".join(header + [""] * (len(BACAccount.asset_field_names) - len(header))),
+        "," * (len(BACAccount.asset_field_names) - 1),
+        ",".join(BACAccount.transaction_field_names),
+        "," * (len(BACAccount.transaction_field_names) - 1),
+        *(",".join(row) for row in rows),
+    ]
+    path.write_text("\n".join(lines) + "\n", encoding=BACAccount.encoding)
+    return path
+
+
+@pytest.fixture
+def budget() -> FakeLunchMoney:
+    """Fake budget with ASSETS."""
+    return FakeLunchMoney(ASSETS)
+
+
+@pytest.fixture
+def budget_url(budget: FakeLunchMoney) -> Iterator[str]:
+    """Serve budget on a free local port."""
+    server = serve(budget)
+    yield f"http://127.0.0.1:{server.server_port}"
+    server.shutdown()
+
+
+@pytest.fixture
+def client(budget_url: str) -> Iterator[Callable[..., LunchMoneyCR]]:
+    """Build clients of the served budget."""
+    transports: list[RedirectTransport] = []
+
+    def build(*, deferred_balance: bool = False, transfer_window: int | None = None) -> LunchMoneyCR:
+        transports.append(RedirectTransport(budget_url))
+        return LunchMoneyCR(
+            "fake-token",
+            deferred_balance=deferred_balance,
+            transfer_window=transfer_window,
+            transport=transports[-1],
+            assume_yes=True,
+        )
+
+    yield build
+    for transport in transports:
+        transport.close()
@@ -0,0 +1,58 @@
+"""Balance checks of BAC account statements."""
+
+import types
+from pathlib import Path
+from typing import TYPE_CHECKING, cast
+
+import pytest
+from conftest import ASSETS, BACRow, bac_rows, write_bac_account
+from lunchable.models import AssetsObject
+
+from entities.bac import BACAccount
+
+if TYPE_CHECKING:
+    from utils import LunchMoneyCR
+
+LUNCH_MONEY = cast("LunchMoneyCR", types.SimpleNamespace(cached_assets=[AssetsObject(**a) for a in ASSETS]))
+# references 100, 101 and 102, balances 900, 950 and 750.
+ROWS = bac_rows(
+    1000,
+    [("01/03/2025", "WALMART", 100, 0), ("02/03/2025", "SINPE", 0, 50), ("03/03/2025", "UBER", 200, 0)],
+)
+
+
+def gaps(
+    path: Path,
+    rows: list[BACRow],
+    *,
+    initial: float | None,
+    total: float | None = None,
+) -> list[tuple[str, float, float]]:
+    """Write a statement and return its gaps as (reference, expected, reported)."""
+    entity = BACAccount(LUNCH_MONEY, write_bac_account(path, rows, initial=initial, total=total))
+    transactions = entity.transactions()
+    found = entity.balance_gaps(transactions)
+    assert entity.validate(transactions) == (not found)
+    return [(gap.transaction["Transaction reference"], gap.expected, gap.reported) for gap in found]
+
+
+@pytest.mark.parametrize("initial", [1000, None])
+def test_consistent(tmp_path: Path, initial: float | None) -> None:
+    """Every balance follows from the previous one, with or without the header initial balance."""
+    assert gaps(tmp_path / "march.csv", ROWS, initial=initial) == []
+
+
+@pytest.mark.parametrize("initial", [1000, None])
+def test_missing_middle_row(tmp_path: Path, initial: float | None) -> None:
+    """The row after the missing one does not add up."""
+    assert gaps(tmp_path / "march.csv", [ROWS[0], ROWS[2]], initial=initial) == [("102", 700, 750)]
+
+
+def test_truncated_tail(tmp_path: Path) -> None:
+    """The statement stops before reaching the header total balance."""
+    assert gaps(tmp_path / "march.csv", ROWS[:2], initial=1000, total=750) == [("101", 750, 950)]
+
+
+def test_missing_header_skips_total(tmp_path: Path) -> None:
+    """Without header balances the total can not be checked, only the rows against each other."""
+    assert gaps(tmp_path / "march.csv", ROWS[:2], initial=None, total=750) == []
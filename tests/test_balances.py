@@ -0,0 +1,62 @@
+"""Deferred balance updates."""
+
+import datetime
+from collections.abc import Callable
+from pathlib import Path
+
+from conftest import bac_rows, write_bac_account
+
+from fakeserver import FakeLunchMoney
+from main import import_profile
+from utils import LunchMoneyCR
+
+FEBRUARY = bac_rows(900, [("03/02/2025", "AUTOMERCADO", 150, 0), ("20/02/2025", "SALARIO", 0, 50)])
+JANUARY = bac_rows(1000, [("10/01/2025", "WALMART", 100, 0)])
+
+
+def statements(path: Path, **files: list[list[str]]) -> Path:
+    """Directory with one BAC account statement per file name."""
+    path.mkdir()
+    for name, rows in files.items():
+        initial = float(rows[0][-1]) - float(rows[0][5]) + float(rows[0][4])
+        write_bac_account(path / f"{name}.csv", rows, initial=initial)
+    return path
+
+
+def balance(budget: FakeLunchMoney) -> tuple[float, str]:
+    """Balance of CR001 and the date it is known at."""
+    cr001 = budget.assets[1]
+    return float(cr001["balance"]), datetime.datetime.fromisoformat(cr001["balance_as_of"]).date().isoformat()
+
+
+def test_statement_total_sets_balance(
+    tmp_path: Path,
+    budget: FakeLunchMoney,
+    client: Callable[..., LunchMoneyCR],
+) -> None:
+    """The closing balance comes from the statement header, as of its last transaction."""
+    import_profile("test", statements(tmp_path / "feb", february=FEBRUARY), client(deferred_balance=True))
+    assert balance(budget) == (800, "2025-02-20")
+
+
+def test_backfill_keeps_newer_balance(
+    tmp_path: Path,
+    budget: FakeLunchMoney,
+    client: Callable[..., LunchMoneyCR],
+) -> None:
+    """An older statement moves the newer balance by its transactions instead of resetting it to its total."""
+    import_profile("test", statements(tmp_path / "feb", february=FEBRUARY), client(deferred_balance=True))
+    import_profile("test", statements(tmp_path / "jan", january=JANUARY), client(deferred_balance=True))
+    assert balance(budget) == (700, "2025-02-20")
+
+
+def test_backfill_with_already_imported_newer_statement(
+    tmp_path: Path,
+    budget: FakeLunchMoney,
+    client: Callable[..., LunchMoneyCR],
+) -> None:
+    """A newer statement with nothing left to insert does not let an older one reset the balance."""
+    import_profile("test", statements(tmp_path / "feb", february=FEBRUARY), client(deferred_balance=True))
+    both = statements(tmp_path / "both", january=JANUARY, february=FEBRUARY)
+    import_profile("test", both, client(deferred_balance=True))
+    assert balance(budget) == (700, "2025-02-20")
@@ -0,0 +1,53 @@
+"""Merging statements of the same asset."""
+
+import types
+from pathlib import Path
+from typing import TYPE_CHECKING, cast
+
+from lunchable.models import AssetsObject
+
+from entities.bac import BACCreditCard
+from entities.base import Base
+from fakeserver import asset
+from merge import merge_by_asset
+
+if TYPE_CHECKING:
+    from utils import LunchMoneyCR
+
+CARD = AssetsObject(**asset(2, "VISA 1234", "crc", "credit"))
+HEADER = [
+    ",".join(BACCreditCard.asset_field_names),
+    "VISA 1234,JOHN,01/03/2025,,,,,,",
+    "Date,,Local,Dollars ",
+]
+
+
+def statement(path: Path, rows: list[str]) -> BACCreditCard:
+    """Write a BAC credit card statement and parse it."""
+    path.write_text("\n".join(HEADER + rows) + "\n", encoding=BACCreditCard.encoding)
+    return BACCreditCard(cast("LunchMoneyCR", types.SimpleNamespace(cached_assets=[CARD])), path)
+
+
+def notes(entities: list[Base]) -> list[str]:
+    """Descriptions of the merged stream of the card."""
+    statements = [(entity, entity.transactions()) for entity in entities]
+    return [BACCreditCard._notes(transaction) for _, transaction in merge_by_asset(statements)[CARD.id]]  # noqa: SLF001
+
+
+def test_same_file_repeats_are_kept(tmp_path: Path) -> None:
+    """Identical charges the same day are different transactions."""
+    rows = ["05/03/2025,CAFE BRITT,2500.00,0.00", "05/03/2025,CAFE BRITT,2500.00,0.00", "06/03/2025,UBER,3000.00,0.00"]
+    assert notes([statement(tmp_path / "march.csv", rows)]) == ["CAFE BRITT", "CAFE BRITT", "UBER"]
+
+
+def test_overlapping_files_are_sent_once(tmp_path: Path) -> None:
+    """Transactions in both files are kept once, repeats as many times as in one file."""
+    march = statement(
+        tmp_path / "march.csv",
+        ["05/03/2025,CAFE BRITT,2500.00,0.00", "05/03/2025,CAFE BRITT,2500.00,0.00", "06/03/2025,UBER,3000.00,0.00"],
+    )
+    quarter = statement(
+        tmp_path / "q1.csv",
+        ["01/02/2025,NETFLIX,5000.00,0.00", "05/03/2025,CAFE BRITT,2500.00,0.00", "06/03/2025,UBER,3000.00,0.00"],
+    )
+    assert notes([march, quarter]) == ["NETFLIX", "CAFE BRITT", "CAFE BRITT", "UBER"]
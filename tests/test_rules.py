@@ -0,0 +1,79 @@
+"""Local payee and category rules."""
+
+import random
+from pathlib import Path
+
+import pytest
+
+from rules import Rule, Rules, normalize
+
+GROCERIES = Rule("Auto Mercado", "Groceries", ["AUTOMERCADO", "AUTO MERCADO"])
+UBER = Rule("Uber", "Transportation", ["UBER"])
+UBER_EATS = Rule("Uber Eats", "Restaurants", ["UBER EATS"])
+CAFE = Rule("Cafe Britt", "Coffee", ["CAFE"])
+COFFEE = Rule("Coffee", "Coffee", ["CAFE"])
+SUFFIX = Rule("Mercado", "Groceries", ["MERCADO"])
+
+
+@pytest.mark.parametrize(
+    ("rules", "text", "expected"),
+    [
+        ([UBER, UBER_EATS], "UBER EATS SAN JOSE", UBER_EATS),
+        ([UBER_EATS, UBER], "UBER TRIP", UBER),
+        ([CAFE, COFFEE], "CAFE BRITT", CAFE),
+        ([COFFEE, CAFE], "CAFE BRITT", COFFEE),
+        ([SUFFIX, GROCERIES], "COMPRA AUTO MERCADO ESCAZU", GROCERIES),
+        ([GROCERIES, SUFFIX], "MERCADO CENTRAL", SUFFIX),
+        ([UBER, GROCERIES], "WALMART", None),
+    ],
+    ids=["longest", "shorter", "tie-first", "tie-order", "suffix-of-longer", "suffix-alone", "no-match"],
+)
+def test_match(rules: list[Rule], text: str, expected: Rule | None) -> None:
+    """The longest pattern wins, then the rule defined first."""
+    assert Rules(rules).match(text) == expected
+
+
+def test_overlapping_patterns() -> None:
+    """A pattern starting inside a partial match of another one is still found."""
+    rules = Rules([Rule("Short", "", ["ABAC"]), Rule("Long", "", ["BACXYZ"])])
+    assert rules.match("ABACXYZ") == rules.rules[1]
+    assert rules.match("ABABAC") == rules.rules[0]
+
+
+def test_normalization() -> None:
+    """Case, accents and repeated whitespace are ignored on both sides."""
+    rules = Rules([Rule("Panaderia", "", ["panadería  LA  Única"])])
+    assert normalize(" Panadería\tla   única ") == "PANADERIA LA UNICA"
+    assert rules.match("POS PANADERIA LA UNICA") == rules.rules[0]
+    assert rules.match("pos panadería  la única") == rules.rules[0]
+
+
+def test_matches_brute_force() -> None:
+    """Random patterns over a small alphabet agree with checking every pattern."""
+    rng = random.Random(0)  # noqa: S311
+    for _ in range(300):
+        rules = [
+            Rule(str(i), "", ["".join(rng.choices("AB ", k=rng.randint(1, 4))) for _ in range(2)]) for i in range(4)
+        ]
+        automaton = Rules(rules)
+        text = "".join(rng.choices("AB ", k=12))
+        candidates = [
+            (-len(normalize(p)), i)
+            for i, rule in enumerate(rules)
+            for p in rule.patterns
+            if normalize(p) and normalize(p) in normalize(text)
+        ]
+        expected = rules[min(candidates)[1]] if candidates else None
+        assert automaton.match(text) == expected, (rules, text)
+
+
+def test_from_file(tmp_path: Path) -> None:
+    """One section per payee, patterns may contain interpolation characters."""
+    rules_file = tmp_path / "rules.ini"
+    rules_file.write_text(
+        "[Auto Mercado]\npatterns = AUTOMERCADO, AUTO MERCADO\ncategory = Groceries\n\n[Promo]\npatterns = 10% OFF\n",
+        encoding="utf-8",
+    )
+    rules = Rules.from_file(rules_file)
+    assert rules.rules == [GROCERIES, Rule("Promo", "", ["10% OFF"])]
+    assert rules.match("TIENDA 10% OFF") == rules.rules[1]
@@ -0,0 +1,79 @@
+"""Matching transfers between own assets."""
+
+import types
+from pathlib import Path
+from typing import TYPE_CHECKING, cast
+
+import pytest
+from conftest import ASSETS, Movement, bac_rows, write_bac_account
+from lunchable.models import AssetsObject
+
+from entities.bac import BACAccount, BACCreditCard
+from entities.base import Base
+from merge import merge_by_asset
+from transfers import match_transfers
+
+if TYPE_CHECKING:
+    from utils import LunchMoneyCR
+
+LUNCH_MONEY = cast("LunchMoneyCR", types.SimpleNamespace(cached_assets=[AssetsObject(**a) for a in ASSETS]))
+
+
+def account(path: Path, movements: list[Movement], product: str = "CR001") -> BACAccount:
+    """BAC account statement starting at 100000."""
+    statement = write_bac_account(path, bac_rows(100000, movements), initial=100000, product=product)
+    return BACAccount(LUNCH_MONEY, statement)
+
+
+def card(path: Path, rows: list[str]) -> BACCreditCard:
+    """BAC credit card statement of VISA 1234, negative amounts are payments."""
+    header = [",".join(BACCreditCard.asset_field_names), "VISA 1234,JOHN,01/03/2025,,,,,,", "Date,,Local,Dollars "]
+    path.write_text("\n".join(header + rows) + "\n", encoding=BACCreditCard.encoding)
+    return BACCreditCard(LUNCH_MONEY, path)
+
+
+def matches(entities: list[Base], window: int) -> list[tuple[str, str]]:
+    """(paid, received) dates of the matched transfers."""
+    streams = merge_by_asset([(entity, entity.transactions()) for entity in entities])
+    return [(t.outflow.date.isoformat(), t.inflow.date.isoformat()) for t in match_transfers(streams, window)]
+
+
+@pytest.mark.parametrize(("window", "expected"), [(1, []), (2, [("2025-03-05", "2025-03-07")])])
+def test_window_edges(tmp_path: Path, window: int, expected: list[tuple[str, str]]) -> None:
+    """Both sides may be posted exactly window days apart, not more."""
+    entities = [
+        account(tmp_path / "account.csv", [("05/03/2025", "PAGO TARJETA", 50000, 0)]),
+        card(tmp_path / "card.csv", ["07/03/2025,SU PAGO,-50000.00,0.00"]),
+    ]
+    assert matches(entities, window) == expected
+
+
+def test_inflow_used_once(tmp_path: Path) -> None:
+    """A second equal payment does not reuse the card payment already matched."""
+    entities = [
+        account(
+            tmp_path / "account.csv",
+            [("05/03/2025", "PAGO TARJETA", 50000, 0), ("06/03/2025", "PAGO TARJETA", 50000, 0)],
+        ),
+        card(tmp_path / "card.csv", ["06/03/2025,SU PAGO,-50000.00,0.00"]),
+    ]
+    assert matches(entities, 2) == [("2025-03-05", "2025-03-06")]
+
+
+def test_closest_inflow_wins(tmp_path: Path) -> None:
+    """Among several candidates inside the window the closest date is taken."""
+    entities = [
+        account(tmp_path / "account.csv", [("05/03/2025", "PAGO TARJETA", 50000, 0)]),
+        card(tmp_path / "card.csv", ["03/03/2025,SU PAGO,-50000.00,0.00", "06/03/2025,SU PAGO,-50000.00,0.00"]),
+    ]
+    assert matches(entities, 3) == [("2025-03-05", "2025-03-06")]
+
+
+def test_disallowed_flows(tmp_path: Path) -> None:
+    """Equal amounts between two accounts or from a card to an account are not transfers."""
+    entities = [
+        account(tmp_path / "first.csv", [("05/03/2025", "SINPE", 50000, 0), ("06/03/2025", "DEVOLUCION", 0, 20000)]),
+        account(tmp_path / "second.csv", [("05/03/2025", "SINPE", 0, 50000)], product="CR0000000000002"),
+        card(tmp_path / "card.csv", ["06/03/2025,TIENDA,20000.00,0.00"]),
+    ]
+    assert matches(entities, 2) == []
@@ -0,0 +1,128 @@
+"""Reading Scotiabank credit card workbooks."""
+
+import types
+import zipfile
+from pathlib import Path
+from typing import TYPE_CHECKING, cast
+
+import pytest
+from conftest import ASSETS
+from lunchable.models import AssetsObject
+
+import xlsx
+from entities.scotiabank import ScotiabankCreditCard
+
+if TYPE_CHECKING:
+    from utils import LunchMoneyCR
+
+MAIN = 'xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"'
+RELS = 'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships"'
+PACKAGE = 'xmlns="http://schemas.openxmlformats.org/package/2006/relationships"'
+SHARED = ["Tarjeta Número:", *ScotiabankCreditCard.transaction_field_names, "AUTOMERCADO", "CRC", "DEBITO"]
+
+
+def shared(text: str) -> str:
+    """Cell content pointing to the shared strings table."""
+    return f'<c t="s"><v>{SHARED.index(text)}</v></c>'
+
+
+def inline(text: str) -> str:
+    """Inline string cell content."""
+    return f'<c t="inlineStr"><is><t>{text}</t></is></c>'
+
+
+def cells(row: int, *values: str, skip: str = "") -> str:
+    """Row XML with cells in columns A, B, ... except the skipped one."""
+    columns = [c for c in "ABCDEFG" if c != skip]
+    body = "".join(
+        value.replace("<c", f'<c r="{column}{row}"', 1) for column, value in zip(columns, values, strict=False)
+    )
+    return f'<row r="{row}">{body}</row>'
+
+
+def sheet(*rows: str) -> str:
+    """Worksheet XML."""
+    return f"<worksheet {MAIN}><sheetData>{''.join(rows)}</sheetData></worksheet>"
+
+
+def workbook(path: Path, sheets: list[str], *, date1904: bool = False) -> Path:
+    """Write a workbook with shared strings, a date cell style (index 1) and the given sheets in order."""
+    entries = "".join(f'<sheet name="S{i}" sheetId="{i}" r:id="rId{i}"/>' for i in range(1, len(sheets) + 1))
+    relationships = "".join(
+        f'<Relationship Id="rId{i}" Type="worksheet" Target="worksheets/sheet{i}.xml"/>'
+        for i in range(1, len(sheets) + 1)
+    )
+    strings = "".join(f"<si><t>{text}</t></si>" for text in SHARED)
+    with zipfile.ZipFile(path, "w") as archive:
+        archive.writestr(
+            "xl/workbook.xml",
+            f'<workbook {MAIN} {RELS}><workbookPr date1904="{int(date1904)}"/><sheets>{entries}</sheets></workbook>',
+        )
+        archive.writestr("xl/_rels/workbook.xml.rels", f"<Relationships {PACKAGE}>{relationships}</Relationships>")
+        archive.writestr("xl/sharedStrings.xml", f"<sst {MAIN}>{strings}</sst>")
+        archive.writestr(
+            "xl/styles.xml",
+            f'<styleSheet {MAIN}><cellXfs><xf numFmtId="0"/><xf numFmtId="14"/></cellXfs></styleSheet>',
+        )
+        for i, content in enumerate(sheets, start=1):
+            archive.writestr(f"xl/worksheets/sheet{i}.xml", content)
+    return path
+
+
+def date(serial: int) -> str:
+    """Date styled number cell content."""
+    return f'<c s="1"><v>{serial}</v></c>'
+
+
+def number(value: float) -> str:
+    """Plain number cell content."""
+    return f"<c><v>{value}</v></c>"
+
+
+@pytest.fixture
+def statement(tmp_path: Path) -> Path:
+    """Card header, field names and a skipped row on the first sheet, one more movement on the second one."""
+    first = sheet(
+        cells(1, shared("Tarjeta Número:"), inline("XXXX-XXXX-XXXX-1234")),
+        cells(2, *(shared(name) for name in ScotiabankCreditCard.transaction_field_names)),
+        cells(4, inline("REF1"), date(45721), shared("AUTOMERCADO"), number(15000.5), shared("CRC"), shared("DEBITO")),
+        cells(5, inline("REF2"), date(45722), number(2000), shared("CRC"), inline("CREDITO"), skip="C"),
+    )
+    second = sheet(
+        cells(1, inline("REF3"), date(45723), inline("UBER"), number(3000), shared("CRC"), shared("DEBITO")),
+    )
+    return workbook(tmp_path / "scotia.xlsx", [first, second])
+
+
+def test_rows(statement: Path) -> None:
+    """Shared and inline strings, dates, skipped columns and every sheet in order."""
+    assert list(xlsx.iter_rows(statement)) == [
+        ["Tarjeta Número:", "XXXX-XXXX-XXXX-1234"],
+        ScotiabankCreditCard.transaction_field_names,
+        ["REF1", "05/03/2025", "AUTOMERCADO", "15000.5", "CRC", "DEBITO"],
+        ["REF2", "06/03/2025", "", "2000", "CRC", "CREDITO"],
+        ["REF3", "07/03/2025", "UBER", "3000", "CRC", "DEBITO"],
+    ]
+
+
+def test_date1904(tmp_path: Path) -> None:
+    """Serial numbers count from 1904 when the workbook says so."""
+    path = workbook(tmp_path / "mac.xlsx", [sheet(cells(1, date(0)), cells(2, date(44259)))], date1904=True)
+    assert list(xlsx.iter_rows(path)) == [["01/01/1904"], ["05/03/2025"]]
+
+
+def test_scotiabank_credit_card(statement: Path) -> None:
+    """The card number selects the asset and every movement is read."""
+    lunch_money = cast("LunchMoneyCR", types.SimpleNamespace(cached_assets=[AssetsObject(**a) for a in ASSETS]))
+    assets = ScotiabankCreditCard.infer(lunch_money, statement)
+    assert [a.name for a in assets] == ["VISA 1234"]
+
+    entity = ScotiabankCreditCard(lunch_money, statement)
+    transactions = entity.transactions()
+    assert [(t["Número de Referencia"], t["Descripción"], t["Monto"]) for t in transactions] == [
+        ("REF1", "AUTOMERCADO", "15000.5"),
+        ("REF2", "", "2000"),
+        ("REF3", "UBER", "3000"),
+    ]
+    assert [entity.transaction_inflow(t) for t in transactions] == [-15000.5, 2000, -3000]
+    assert all(entity.transaction_asset(t) == assets[0] for t in transactions)